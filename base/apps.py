@@ -7,4 +7,5 @@ class BaseConfig(AppConfig):
 
 
     def ready(self):
+        import base.checks
         import base.signals
\ No newline at end of file
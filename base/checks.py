@@ -0,0 +1,17 @@
+from django.core.checks import Warning, register
+
+
+@register()
+def check_pillow_jpeg_backend(app_configs, **kwargs):
+    """Warn when Pillow was built without libjpeg-turbo (slow JPEG decode/encode)."""
+    from PIL import features
+
+    if features.check_feature('libjpeg_turbo'):
+        return []
+    return [
+        Warning(
+            'Pillow is not linked against libjpeg-turbo.',
+            hint='Install the Pillow wheel from PyPI or build pillow-simd against libjpeg-turbo.',
+            id='base.W001',
+        )
+    ]
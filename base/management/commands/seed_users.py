@@ -1,6 +1,10 @@
+import secrets
+
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.core.management import BaseCommand
-from django_seed import Seed
+
+from base.models import Profile
 
 User = get_user_model()
 
@@ -8,18 +12,29 @@ User = get_user_model()
 class Command(BaseCommand):
     help = 'Seeds users'
     def add_arguments(self, parser):
-        parser.add_argument('--number', type=int, help='Number of users to create')
+        parser.add_argument('--number', type=int, default=10, help='Number of users to create')
+        parser.add_argument('--password', default='seed', help='Password given to every seeded user')
 
     def handle(self, *args, **options):
         number = options['number']
-        seeder = Seed.seeder()
-        seeder.add_entity(User, number, {
-            "is_active": False,
-            "is_superuser": False,
-            "is_staff": False,
-            "is_super_admin":False,
-            "is_shop_admin": False,
-            "is_warehouse_admin": False,
-        })
-        seeder.execute()
-        self.stdout.write(self.style.SUCCESS('Successfully created users'))
\ No newline at end of file
+        run_id = secrets.token_hex(4)
+        # Hashing is the expensive part; every seeded user shares the one hash
+        password = make_password(options['password'])
+
+        # bulk_create skips save() and post_save, so profiles are inserted below
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f'seed-{run_id}-{i}@example.com',
+                    username=f'seed-{run_id}-{i}',
+                    password=password,
+                    is_active=False,
+                    is_superuser=False,
+                    is_staff=False,
+                )
+                for i in range(number)
+            ],
+            batch_size=500,
+        )
+        Profile.objects.ensure_for_users(users)
+        self.stdout.write(self.style.SUCCESS(f'Successfully created {len(users)} users'))
@@ -1,5 +1,6 @@
 # managers.py
 from django.contrib.auth.models import BaseUserManager
+from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 
@@ -46,3 +47,19 @@ class UserManager(BaseUserManager):
             raise ValueError(_('Superuser must have is_superuser=True.'))
 
         return self._create_user(email, password, **extra_fields)
+
+
+class ProfileManager(models.Manager):
+    """
+    Manager for the Profile model.
+    """
+
+    def ensure_for_users(self, users, batch_size=500):
+        """
+        Create missing profiles for the given users in a single INSERT ... ON CONFLICT DO NOTHING.
+        """
+        return self.bulk_create(
+            [self.model(user=user) for user in users],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
@@ -0,0 +1,208 @@
+# Switches User and Profile to bigint primary keys. The former UUID primary
+# keys are kept, unchanged, as ``public_id`` so identifiers already handed out
+# (upload paths, the agent payload) stay stable.
+#
+# Logged-in sessions store the old UUID as _auth_user_id, which BigAutoField
+# rejects, so the session table is flushed here and everyone signs in again.
+# Deployments that move SESSION_ENGINE off the database must flush sessions
+# themselves when applying this migration.
+
+from django.db import migrations, models
+import uuid
+
+# (table, column, nullable) for every foreign key pointing at base_user.
+USER_FOREIGN_KEYS = [
+    ("base_profile", "user_id", False),
+    ("base_user_groups", "user_id", False),
+    ("base_user_user_permissions", "user_id", False),
+    ("django_admin_log", "user_id", False),
+    ("tickets_ticket", "user_id", False),
+    ("tickets_ticket", "assigned_to_id", True),
+    ("tickets_ticketinteraction", "user_id", False),
+    ("solutions_solution", "created_by_id", True),
+    ("solutions_solution", "verified_by_id", True),
+    ("solutions_knowledgebaseentry", "verified_by_id", True),
+]
+
+
+def _forwards_sql():
+    statements = [
+        "ALTER TABLE base_user ADD COLUMN new_id bigint GENERATED BY DEFAULT AS IDENTITY",
+    ]
+    for table, column, nullable in USER_FOREIGN_KEYS:
+        statements += [
+            f"ALTER TABLE {table} ADD COLUMN {column}_new bigint",
+            f"UPDATE {table} SET {column}_new = u.new_id FROM base_user u WHERE {table}.{column} = u.id",
+            # Dropping the old column also drops its FK constraint and indexes.
+            f"ALTER TABLE {table} DROP COLUMN {column}",
+            f"ALTER TABLE {table} RENAME COLUMN {column}_new TO {column}",
+        ]
+        if not nullable:
+            statements.append(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+
+    statements += [
+        "ALTER TABLE base_user DROP CONSTRAINT base_user_pkey",
+        "ALTER TABLE base_user RENAME COLUMN id TO public_id",
+        "ALTER TABLE base_user ADD CONSTRAINT base_user_public_id_key UNIQUE (public_id)",
+        "ALTER TABLE base_user RENAME COLUMN new_id TO id",
+        "ALTER TABLE base_user ADD PRIMARY KEY (id)",
+        "ALTER TABLE base_profile DROP CONSTRAINT base_profile_pkey",
+        "ALTER TABLE base_profile RENAME COLUMN id TO public_id",
+        "ALTER TABLE base_profile ADD CONSTRAINT base_profile_public_id_key UNIQUE (public_id)",
+        "ALTER TABLE base_profile ADD COLUMN id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY",
+    ]
+
+    for table, column, _nullable in USER_FOREIGN_KEYS:
+        statements += [
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fk_base_user_id "
+            f"FOREIGN KEY ({column}) REFERENCES base_user (id) DEFERRABLE INITIALLY DEFERRED",
+            f"CREATE INDEX {table}_{column}_idx ON {table} ({column})",
+        ]
+
+    statements += [
+        "ALTER TABLE base_profile ADD CONSTRAINT base_profile_user_id_key UNIQUE (user_id)",
+        "ALTER TABLE base_user_groups ADD CONSTRAINT base_user_groups_user_id_group_id_uniq "
+        "UNIQUE (user_id, group_id)",
+        "ALTER TABLE base_user_user_permissions ADD CONSTRAINT base_user_user_permissions_user_id_permission_id_uniq "
+        "UNIQUE (user_id, permission_id)",
+    ]
+    return statements
+
+
+def _backwards_sql():
+    # Mirror of _forwards_sql: public_id becomes the UUID primary key again and
+    # every foreign key is pointed back at it. Constraint names differ from the
+    # ones 0001 created, which Django doesn't depend on.
+    statements = []
+    for table, column, nullable in USER_FOREIGN_KEYS:
+        statements += [
+            f"ALTER TABLE {table} ADD COLUMN {column}_old uuid",
+            f"UPDATE {table} SET {column}_old = u.public_id FROM base_user u WHERE {table}.{column} = u.id",
+            f"ALTER TABLE {table} DROP COLUMN {column}",
+            f"ALTER TABLE {table} RENAME COLUMN {column}_old TO {column}",
+        ]
+        if not nullable:
+            statements.append(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+
+    statements += [
+        "ALTER TABLE base_user DROP CONSTRAINT base_user_pkey",
+        "ALTER TABLE base_user DROP COLUMN id",
+        "ALTER TABLE base_user DROP CONSTRAINT base_user_public_id_key",
+        "ALTER TABLE base_user RENAME COLUMN public_id TO id",
+        "ALTER TABLE base_user ADD PRIMARY KEY (id)",
+        "ALTER TABLE base_profile DROP CONSTRAINT base_profile_pkey",
+        "ALTER TABLE base_profile DROP COLUMN id",
+        "ALTER TABLE base_profile DROP CONSTRAINT base_profile_public_id_key",
+        "ALTER TABLE base_profile RENAME COLUMN public_id TO id",
+        "ALTER TABLE base_profile ADD PRIMARY KEY (id)",
+    ]
+
+    for table, column, _nullable in USER_FOREIGN_KEYS:
+        statements += [
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fk_base_user_id "
+            f"FOREIGN KEY ({column}) REFERENCES base_user (id) DEFERRABLE INITIALLY DEFERRED",
+            f"CREATE INDEX {table}_{column}_idx ON {table} ({column})",
+        ]
+
+    statements += [
+        "ALTER TABLE base_profile ADD CONSTRAINT base_profile_user_id_key UNIQUE (user_id)",
+        "ALTER TABLE base_user_groups ADD CONSTRAINT base_user_groups_user_id_group_id_uniq "
+        "UNIQUE (user_id, group_id)",
+        "ALTER TABLE base_user_user_permissions ADD CONSTRAINT base_user_user_permissions_user_id_permission_id_uniq "
+        "UNIQUE (user_id, permission_id)",
+    ]
+    return statements
+
+
+def flush_sessions(apps, schema_editor):
+    apps.get_model("sessions", "Session").objects.all().delete()
+
+
+class PostgresBigintPrimaryKeys(migrations.SeparateDatabaseAndState):
+    """
+    Runs the data-preserving SQL on Postgres only. The SQL is Postgres-specific
+    (identity columns, UPDATE ... FROM), and other backends are throwaway SQLite
+    dev databases, so there the state changes are applied as ordinary schema
+    operations instead. Those can't convert existing UUID rows; recreate the
+    database if it already has users.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        for operation in self.state_operations:
+            to_state = from_state.clone()
+            operation.state_forwards(app_label, to_state)
+            operation.database_forwards(app_label, schema_editor, from_state, to_state)
+            from_state = to_state
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        # Undo in reverse order, each against the state it was applied from
+        states = [to_state]
+        for operation in self.state_operations[:-1]:
+            state = states[-1].clone()
+            operation.state_forwards(app_label, state)
+            states.append(state)
+        for operation, state in reversed(list(zip(self.state_operations, states))):
+            after = state.clone()
+            operation.state_forwards(app_label, after)
+            operation.database_backwards(app_label, schema_editor, after, state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0001_initial"),
+        ("admin", "0003_logentry_add_action_flag_choices"),
+        ("tickets", "0001_initial"),
+        ("solutions", "0001_initial"),
+        ("sessions", "0001_initial"),
+    ]
+
+    operations = [
+        PostgresBigintPrimaryKeys(
+            database_operations=[
+                migrations.RunSQL(_forwards_sql(), reverse_sql=_backwards_sql()),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="user",
+                    name="id",
+                    field=models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                migrations.AddField(
+                    model_name="user",
+                    name="public_id",
+                    field=models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Public identifier for the user, safe to expose outside the database",
+                        unique=True,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="profile",
+                    name="id",
+                    field=models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                migrations.AddField(
+                    model_name="profile",
+                    name="public_id",
+                    field=models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Public identifier for the profile",
+                        unique=True,
+                    ),
+                ),
+            ],
+        ),
+        # Session user ids are primary keys, which change type in both directions
+        migrations.RunPython(flush_sessions, flush_sessions),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0002_bigint_primary_keys"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="user",
+            name="base_user_email_8a5bc6_idx",
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["email"],
+                include=["id", "password", "is_verified", "is_active"],
+                name="user_email_login_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0003_user_email_login_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("secure_code__isnull", False)),
+                fields=["secure_code_expiry"],
+                name="user_secure_code_expiry_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+def hash_existing_codes(apps, schema_editor):
+    from base.utils import hash_secure_code
+
+    User = apps.get_model("base", "User")
+    users = list(User.objects.filter(secure_code__isnull=False).only("id", "secure_code"))
+    for user in users:
+        user.secure_code = hash_secure_code(user.secure_code)
+    User.objects.bulk_update(users, ["secure_code"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0006_alter_user_username"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="secure_code",
+            field=models.CharField(
+                blank=True,
+                help_text="Hash of the auto-generated secure code for user verification",
+                max_length=32,
+                null=True,
+                verbose_name="secure code",
+            ),
+        ),
+        migrations.RunPython(hash_existing_codes, migrations.RunPython.noop),
+    ]
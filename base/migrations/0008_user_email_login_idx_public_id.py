@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0007_hash_secure_codes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="user",
+            name="user_email_login_idx",
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["email"],
+                include=["id", "public_id", "password", "is_verified", "is_active"],
+                name="user_email_login_idx",
+            ),
+        ),
+    ]
@@ -1,6 +1,8 @@
 import os
+import re
 import uuid
 from datetime import timedelta
+from functools import cached_property
 from io import BytesIO
 
 from PIL import Image
@@ -10,25 +12,45 @@ from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.core.validators import FileExtensionValidator
-from django.core.validators import RegexValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 from django.utils import timezone
 from django.utils.crypto import constant_time_compare
 from django.utils.translation import gettext_lazy as _
 
-from .manager import UserManager
-from .utils import generate_secure_code
+from .manager import ProfileManager, UserManager
+from .tasks import generate_thumbnail
+from .utils import flatten_to_rgb, generate_secure_code, hash_secure_code
+
+try:
+    import pyvips
+except (ImportError, OSError):
+    # pyvips is installed but unusable without the libvips shared library
+    pyvips = None
+
+_USERNAME_RE = re.compile(r'\A[\w.@+-]+\Z')
 
 
 def profile_image_path(instance, filename):
     """Generate upload path for profile images"""
     try:
-        user_id = instance.user.id if instance.user else 'unknown'
+        user_id = instance.user.public_id if instance.user else 'unknown'
         return f"profiles/{user_id}/{filename}"
     except (AttributeError, Profile.user.RelatedObjectDoesNotExist):
         return f"profiles/temp/{filename}"
 
 
+def validate_username(value):
+    """
+    Validate that a username only contains letters, digits and @/./+/-/_.
+    """
+    if not _USERNAME_RE.match(value):
+        raise ValidationError(
+            _('Enter a valid username. This value may contain only letters, numbers, and @/./+/-/_ characters.'),
+            code='invalid',
+        )
+
+
 def validate_image_size(image):
     """
     Validate image file size (max 5MB).
@@ -44,11 +66,11 @@ class User(AbstractBaseUser, PermissionsMixin):
     Uses email as the unique identifier instead of username.
     """
 
-    id = models.UUIDField(
-        primary_key=True,
+    public_id = models.UUIDField(
         default=uuid.uuid4,
+        unique=True,
         editable=False,
-        help_text=_("Unique identifier for the user")
+        help_text=_("Public identifier for the user, safe to expose outside the database")
     )
 
     email = models.EmailField(
@@ -64,13 +86,7 @@ class User(AbstractBaseUser, PermissionsMixin):
         _("username"),
         max_length=150,
         unique=True,
-        validators=[
-            RegexValidator(
-                regex=r'^[\w.@+-]+$',
-                message=_(
-                    'Enter a valid username. This value may contain only letters, numbers, and @/./+/-/_ characters.')
-            )
-        ],
+        validators=[validate_username],
         help_text=_("Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only."),
         error_messages={
             'unique': _("A user with that username already exists."),
@@ -93,10 +109,10 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     secure_code = models.CharField(
         _("secure code"),
-        max_length=6,
+        max_length=32,
         null=True,
         blank=True,
-        help_text=_("Auto-generated secure code for user verification")
+        help_text=_("Hash of the auto-generated secure code for user verification")
     )
 
     secure_code_expiry = models.DateTimeField(verbose_name=_("secure code expiry"),
@@ -146,9 +162,13 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = _("User")
         verbose_name_plural = _("Users")
         indexes = [
-            models.Index(fields=['email']),
+            # Covers LoginSerializer's only(); public_id is the simplejwt USER_ID_FIELD
+            models.Index(fields=['email'], include=['id', 'public_id', 'password', 'is_verified', 'is_active'],
+                         name='user_email_login_idx'),
             models.Index(fields=['secure_code']),
-            models.Index(fields=['is_active', 'is_staff']),
+            models.Index(fields=['secure_code_expiry'], condition=Q(secure_code__isnull=False),
+                         name='user_secure_code_expiry_idx'),
+            models.Index(fields=['email'], condition=Q(is_staff=True), name='user_staff_email_idx'),
         ]
 
     def __str__(self):
@@ -160,10 +180,12 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def save(self, *args, **kwargs):
         if not self.pk and not self.secure_code:
-            self.secure_code = generate_secure_code()
-            self.secure_code_expiry = timezone.now() + timedelta(minutes=10)
+            self.set_secure_code()
 
-        self.email = self.__class__.objects.normalize_email(self.email)
+        # update_fields saves that don't write the email can skip re-normalizing it
+        update_fields = kwargs.get('update_fields')
+        if self.email and (update_fields is None or 'email' in update_fields):
+            self.email = self.__class__.objects.normalize_email(self.email)
 
         super().save(*args, **kwargs)
 
@@ -197,21 +219,18 @@ class User(AbstractBaseUser, PermissionsMixin):
             raise ValueError(_("User is already verified."))
         if secure_code is None:
             raise ValueError(_("Secure code is required for verification."))
-        if not constant_time_compare(str(self.secure_code), str(secure_code)):
+        if not self.secure_code_matches(secure_code):
             raise ValueError(_("Invalid secure code."))
         if self.secure_code_expiry < timezone.now():
-            self.secure_code = None
-            self.secure_code_expiry = None
-            self.save(update_fields=['secure_code', 'secure_code_expiry'])
             raise ValueError(_("Secure code has expired."))
 
         self.is_verified = True
         self.is_active = True
         self.secure_code = None
         self.secure_code_expiry = None
-        self.save(update_fields=['is_verified', 'is_active', 'secure_code', 'secure_code_expiry'])
-        self.refresh_from_db()
-        print(f"After save: secure_code_expiry = {self.secure_code_expiry}")
+        self.__class__.objects.filter(pk=self.pk).update(
+            is_verified=True, is_active=True, secure_code=None, secure_code_expiry=None
+        )
 
     def check_user_is_verified(self, secure_code=None) -> bool:
         """
@@ -229,26 +248,39 @@ class User(AbstractBaseUser, PermissionsMixin):
             self.verify_user(secure_code)
             return True
         except ValueError:
-            self.secure_code = generate_secure_code()
-            self.secure_code_expiry = timezone.now() + timedelta(minutes=15)
-            self.save(update_fields=['secure_code', 'secure_code_expiry'])
+            self.generate_new_secure_code(expiry_minutes=15)
+            return False
+
+    def set_secure_code(self, expiry_minutes=10):
+        """
+        Issue a new secure code without saving.
+        Only the hash is kept on the instance; the plaintext is returned for delivery.
+        """
+        code = generate_secure_code()
+        self.secure_code = hash_secure_code(code)
+        self.secure_code_expiry = timezone.now() + timedelta(minutes=expiry_minutes)
+        return code
+
+    def secure_code_matches(self, secure_code) -> bool:
+        """Check a submitted code against the stored hash in constant time."""
+        if not self.secure_code or secure_code is None:
             return False
+        return constant_time_compare(self.secure_code, hash_secure_code(secure_code))
 
-    def generate_new_secure_code(self):
-        """Generate a new secure code for the user."""
-        self.secure_code = generate_secure_code()
-        self.secure_code_expiry = timezone.now() + timedelta(minutes=5)
+    def generate_new_secure_code(self, expiry_minutes=5):
+        """Generate and save a new secure code, returning the plaintext."""
+        code = self.set_secure_code(expiry_minutes)
         self.save(update_fields=['secure_code', 'secure_code_expiry'])
-        return  self.secure_code
+        return code
 
 
 class Profile(models.Model):
     """
 Profile model that extends the User model with additional fields.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True,
-                          help_text=_("Unique identifier for the user")
-                          )
+    public_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True,
+                                 help_text=_("Public identifier for the profile")
+                                 )
 
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile', verbose_name='User',
                                 help_text="The user associated with this profile")
@@ -283,85 +315,133 @@ Profile model that extends the User model with additional fields.
 
     city = models.CharField(max_length=300, verbose_name='City', help_text="The city where the user resides")
 
+    objects = ProfileManager()
+
     def __str__(self):
         return self.user.username
 
+    @staticmethod
+    def cache_key(user_id):
+        """Key under which the current-user profile endpoint caches this user's profile."""
+        return f'profile:{user_id}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored file names so save() can detect an image change without a SELECT
+        instance._loaded_images = {
+            name: value for name, value in zip(field_names, values)
+            if name in ('profile_image', 'thumbnail')
+        }
+        return instance
+
     def save(self, *args, **kwargs):
-        if self.pk:
-            try:
-                old_profile = Profile.objects.get(pk=self.pk)
-                if old_profile.profile_image != self.profile_image:
-                    self.delete_old_images(old_profile)
-            except Profile.DoesNotExist:
-                pass
+        loaded = getattr(self, '_loaded_images', {})
+        image_changed = self._state.adding or (
+            'profile_image' in loaded and (loaded['profile_image'] or '') != (self.profile_image.name or '')
+        )
+        if image_changed and not self._state.adding:
+            self.delete_old_images(loaded.get('profile_image'), loaded.get('thumbnail'))
+            self.thumbnail = None
 
         super().save(*args, **kwargs)
+        self._loaded_images = {'profile_image': self.profile_image.name, 'thumbnail': self.thumbnail.name}
+        if image_changed:
+            self.__dict__.pop('profile_image_url', None)
+            self.__dict__.pop('thumbnail_url', None)
 
-        # Generate thumbnail after saving
-        if self.profile_image:
-            self.create_thumbnail()
+        # Generate thumbnail in the background once the row is committed
+        if self.profile_image and image_changed:
+            transaction.on_commit(lambda: generate_thumbnail.delay(self.pk))
 
-    def delete_old_images(self, old_profile):
+    def delete_old_images(self, image_name, thumbnail_name):
         """Delete old profile images and thumbnails."""
-        if old_profile.profile_image:
-            if default_storage.exists(old_profile.profile_image.name):
-                default_storage.delete(old_profile.profile_image.name)
+        if image_name:
+            if default_storage.exists(image_name):
+                default_storage.delete(image_name)
 
-        if old_profile.thumbnail:
-            if default_storage.exists(old_profile.thumbnail.name):
-                default_storage.delete(old_profile.thumbnail.name)
+        if thumbnail_name:
+            if default_storage.exists(thumbnail_name):
+                default_storage.delete(thumbnail_name)
 
     def create_thumbnail(self, size=(150, 150)):
         """
         Create a thumbnail from the profile image.
+
+        The file is written to storage and assigned in memory only; the caller
+        persists the ``thumbnail`` column. Returns True on success.
         """
         if not self.profile_image:
-            return
+            return False
 
         try:
-            image = Image.open(self.profile_image.path)
-
-            if image.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                if image.mode == 'P':
-                    image = image.convert('RGBA')
-                background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = background
-
-            image.thumbnail(size, Image.Resampling.LANCZOS)
-
-            thumb_io = BytesIO()
-            image.save(thumb_io, format='JPEG', quality=85, optimize=True)
-            thumb_io.seek(0)
+            with default_storage.open(self.profile_image.name, 'rb') as image_file:
+                if pyvips is not None:
+                    thumb_bytes = self._render_thumbnail_vips(image_file.read(), size)
+                else:
+                    thumb_bytes = self._render_thumbnail_pillow(image_file, size)
 
+            # upload_to already places the file under profiles/<user>/
             thumb_name = f"thumb_{os.path.basename(self.profile_image.name)}"
-            thumb_path = f"profiles/{self.user.id}/{thumb_name}"
 
             self.thumbnail.save(
-                thumb_path,
-                ContentFile(thumb_io.read()),
+                thumb_name,
+                ContentFile(thumb_bytes),
                 save=False
             )
-
-            Profile.objects.filter(pk=self.pk).update(thumbnail=self.thumbnail)
+            return True
 
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
-            logger.error(f"Error creating thumbnail for user {self.user.id}: {str(e)}")
+            logger.error(f"Error creating thumbnail for user {self.user.public_id}: {str(e)}")
+            return False
 
-    def get_profile_image_url(self):
-        """Get profile image URL with fallback to default."""
+    @staticmethod
+    def _render_thumbnail_vips(data, size):
+        """Resize with libvips, which shrinks on load and never decodes the full image."""
+        image = pyvips.Image.thumbnail_buffer(data, size[0], height=size[1])
+        if image.hasalpha():
+            image = image.flatten(background=[255, 255, 255])
+        return image.jpegsave_buffer(Q=85, strip=True)
+
+    @staticmethod
+    def _render_thumbnail_pillow(image_file, size):
+        """Resize with Pillow when libvips is not available."""
+        image = Image.open(image_file)
+        # Let libjpeg downscale in the DCT domain before decoding full size
+        image.draft('RGB', size)
+        image.load()
+
+        image = flatten_to_rgb(image)
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+
+        thumb_io = BytesIO()
+        image.save(thumb_io, format='JPEG', quality=85)
+        return thumb_io.getvalue()
+
+    @cached_property
+    def profile_image_url(self):
+        """Profile image URL with fallback to default, resolved once per instance."""
         if self.profile_image:
             return self.profile_image.url
         return self.get_default_image_url()
 
-    def get_thumbnail_url(self):
-        """Get thumbnail URL with fallback to default."""
+    @cached_property
+    def thumbnail_url(self):
+        """Thumbnail URL with fallback to default, resolved once per instance."""
         if self.thumbnail:
             return self.thumbnail.url
         return self.get_default_image_url()
 
+    def get_profile_image_url(self):
+        """Get profile image URL with fallback to default."""
+        return self.profile_image_url
+
+    def get_thumbnail_url(self):
+        """Get thumbnail URL with fallback to default."""
+        return self.thumbnail_url
+
     def get_default_image_url(self):
         """Return default profile image URL."""
         return f"{settings.STATIC_URL}images/default-profile.png"
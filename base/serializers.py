@@ -1,14 +1,14 @@
-from datetime import timedelta
+import os
 
-from django.conf import settings
-from django.urls import reverse
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
-from django.utils.crypto import constant_time_compare
 from rest_framework import serializers
 
 from .models import User, Profile
-from .tasks import send_email_with_template
-from .utils import ImageProcessor, generate_secure_code
+from .tasks import build_email_html, process_profile_image, send_prebuilt_email
+from .utils import VERIFY_URL, ImageProcessor
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -25,10 +25,12 @@ class RegisterSerializer(serializers.ModelSerializer):
         if password != confirm_password:
             raise serializers.ValidationError('Passwords do not match')
 
-        if User.objects.filter(username=data['username']).exists():
-            raise serializers.ValidationError('Username already exists')
-
-        if User.objects.filter(email=data['email']).exists():
+        clash = User.objects.filter(
+            Q(username=data['username']) | Q(email=data['email'])
+        ).values('username', 'email').first()
+        if clash:
+            if clash['username'] == data['username']:
+                raise serializers.ValidationError('Username already exists')
             raise serializers.ValidationError('Email already registered')
         return data
 
@@ -40,7 +42,7 @@ class LoginSerializer(serializers.Serializer):
     def validate(self, data):
         email = data['email']
         password = data['password']
-        user = User.objects.filter(email=email).first()
+        user = User.objects.only('id', 'public_id', 'email', 'password', 'is_verified', 'is_active').filter(email=email).first()
 
         if not user:
             raise serializers.ValidationError('No user found with this email')
@@ -51,6 +53,7 @@ class LoginSerializer(serializers.Serializer):
         if not user.check_password(password):
             raise serializers.ValidationError('Invalid password')
 
+        data['user'] = user
         return data
 
 
@@ -73,22 +76,20 @@ class VerifyUserSerializer(serializers.Serializer):
             error_message = str(e)
 
             if "expired" in error_message.lower() and not user.is_verified:
-                user.secure_code = generate_secure_code()
-                user.secure_code_expiry = timezone.now() + timedelta(minutes=15)
-                user.save(update_fields=['secure_code', 'secure_code_expiry'])
+                secure_code = user.generate_new_secure_code(expiry_minutes=15)
                 data = {
                     "subject": "New verification code",
 
                 }
                 context = {
                     "email": user.email,
-                    "token": user.secure_code,
+                    "token": secure_code,
                     "username": user.username,
                     "expiration": user.secure_code_expiry,
                     "app_name": "ResolveMeQ",
-                    "verification_link": settings.FRONTEND_URL + reverse('verify-user'),
+                    "verification_link": str(VERIFY_URL),
                 }
-                send_email_with_template.delay(data, 'welcome.html', context, [user.email])
+                send_prebuilt_email.delay(data, build_email_html('welcome.html', context), [user.email])
                 error_message += " A new verification code has been sent."
 
             raise serializers.ValidationError(error_message)
@@ -125,10 +126,10 @@ class ChangePasswordSerializer(serializers.Serializer):
         if not user.check_password(old_password):
             raise serializers.ValidationError("Old password is incorrect")
 
-        if not constant_time_compare(new_password, confirm_password):
+        if new_password != confirm_password:
             raise serializers.ValidationError("New passwords do not match")
 
-        if constant_time_compare(old_password, new_password):
+        if old_password == new_password:
             raise serializers.ValidationError("Old password cannot be the same as new password")
 
         return data
@@ -146,7 +147,7 @@ class ResetPasswordSerializer(serializers.Serializer):
         return value
 
     def validate(self, data):
-        if not constant_time_compare(str(data['new_password']), str(data['confirm_password'])):
+        if data['new_password'] != data['confirm_password']:
             raise serializers.ValidationError("Passwords do not match")
 
         email = data['email']
@@ -155,7 +156,7 @@ class ResetPasswordSerializer(serializers.Serializer):
         try:
             user = User.objects.get(email=email)
 
-            if not user.secure_code or not constant_time_compare(str(user.secure_code), str(token)):
+            if not user.secure_code_matches(token):
                 raise serializers.ValidationError("Invalid or expired reset token")
 
             if user.secure_code_expiry and user.secure_code_expiry < timezone.now():
@@ -174,8 +175,7 @@ class ResetPasswordSerializer(serializers.Serializer):
         try:
             user = User.objects.get(email=email)
 
-            if (user.secure_code and
-                    constant_time_compare(str(user.secure_code), str(token)) and
+            if (user.secure_code_matches(token) and
                     user.secure_code_expiry and
                     user.secure_code_expiry >= timezone.now()):
 
@@ -199,17 +199,19 @@ class ResendVerificationCodeSerializer(serializers.Serializer):
     """
     email = serializers.EmailField(required=True)
 
-    def validate_email(self, value):
+    def validate(self, data):
         """
         Validate that the email exists and is not verified.
         """
-        try:
-            user = User.objects.get(email=value)
-            if user.is_verified:
-                raise serializers.ValidationError("User is already verified")
-        except User.DoesNotExist:
-            raise serializers.ValidationError("User with this email does not exist")
-        return value
+        user = User.objects.only(
+            'id', 'email', 'username', 'is_verified', 'secure_code', 'secure_code_expiry'
+        ).filter(email=data['email']).first()
+        if user is None:
+            raise serializers.ValidationError({'email': "User with this email does not exist"})
+        if user.is_verified:
+            raise serializers.ValidationError({'email': "User is already verified"})
+        data['user'] = user
+        return data
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -219,7 +221,6 @@ class UserProfileSerializer(serializers.ModelSerializer):
     profile_image = serializers.ImageField(
         required=False,
         allow_null=True,
-        validators=[ImageProcessor.validate_image]
     )
 
     thumbnail_url = serializers.SerializerMethodField()
@@ -230,7 +231,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = Profile
         fields = [
-            'id',
+            'public_id',
             'user_email',
             'user_full_name',
             'profile_image',
@@ -241,23 +242,39 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'city'
         ]
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Join the user row and trim columns to what this serializer reads.
+        :param queryset: Profile queryset
+        :return: queryset with select_related/only applied
+        """
+        return queryset.select_related('user').only(
+            'id', 'public_id', 'bio', 'location', 'city', 'profile_image', 'thumbnail',
+            'user__public_id', 'user__email', 'user__first_name', 'user__last_name',
+        )
+
+    def _absolute_url(self, url):
+        """Build an absolute URL unless the storage backend already returned one."""
+        request = self.context.get('request')
+        if request and not url.startswith(('http://', 'https://')):
+            return request.build_absolute_uri(url)
+        return url
+
     def get_profile_image_url(self, obj):
         """Get full URL for profile image."""
         if obj.profile_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.profile_image.url)
-            return obj.profile_image.url
-        return obj.get_default_image_url()
+            return self._absolute_url(obj.profile_image_url)
+        return obj.profile_image_url
 
     def get_thumbnail_url(self, obj):
         """Get full URL for thumbnail."""
         if obj.thumbnail:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.thumbnail.url)
-            return obj.thumbnail.url
-        return obj.get_default_image_url()
+            return self._absolute_url(obj.thumbnail_url)
+        return obj.thumbnail_url
+
+    # Set by update() when an uploaded image was handed to process_profile_image
+    image_pending = False
 
     def validate_profile_image(self, value):
         """Additional validation for profile image."""
@@ -265,14 +282,20 @@ class UserProfileSerializer(serializers.ModelSerializer):
             ImageProcessor.validate_image(value)
         return value
 
-
-
     def update(self, instance, validated_data):
         """Handle image updates properly."""
         profile_image = validated_data.get('profile_image')
-
         if profile_image:
-            optimized_image = ImageProcessor.optimize_image(profile_image)
-            validated_data['profile_image'] = optimized_image
+            del validated_data['profile_image']
+
+        instance = super().update(instance, validated_data)
 
-        return super().update(instance, validated_data)
+        if profile_image:
+            # Stage the raw upload; optimizing and thumbnailing run in the worker
+            storage_key = default_storage.save(
+                f'incoming/{instance.public_id}/{os.path.basename(profile_image.name)}', profile_image
+            )
+            transaction.on_commit(lambda: process_profile_image.delay(instance.pk, storage_key))
+            self.image_pending = True
+
+        return instance
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
@@ -16,25 +17,13 @@ def create_user_profile(sender, instance, created, **kwargs):
     if created:
         def on_commit():
             try:
-                Profile.objects.get_or_create(user=instance)
+                Profile.objects.ensure_for_users([instance])
             except Exception as e:
                 logger.error(f"Error creating profile for user {instance.id}: {str(e)}")
 
         transaction.on_commit(on_commit)
 
 
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    """Save user profile when user is saved."""
-    try:
-        if hasattr(instance, 'profile'):
-            instance.profile.save()
-    except Profile.DoesNotExist:
-        Profile.objects.create(user=instance)
-    except Exception as e:
-        logger.error(f"Error saving profile for user {instance.id}: {str(e)}")
-
-
 @receiver(post_delete, sender=User)
 def delete_user_profile(sender, instance, **kwargs):
     """Delete user profile when user is deleted."""
@@ -42,3 +31,19 @@ def delete_user_profile(sender, instance, **kwargs):
         instance.profile.delete()
     except Profile.DoesNotExist:
         pass
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def evict_cached_profile(sender, instance, **kwargs):
+    """Drop the current-user profile endpoint's cached response once the change commits."""
+    key = Profile.cache_key(instance.user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+@receiver(post_save, sender=User)
+def evict_cached_user_profile(sender, instance, created, **kwargs):
+    """The cached profile response embeds the user's email and name."""
+    if not created:
+        key = Profile.cache_key(instance.pk)
+        transaction.on_commit(lambda: cache.delete(key))
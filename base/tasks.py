@@ -1,27 +1,247 @@
 import logging
+import os
+import queue
+from contextlib import contextmanager
+from functools import lru_cache
+from smtplib import SMTPServerDisconnected
 
+import redis
 from celery import shared_task
+from celery.signals import worker_process_init, worker_ready
 from django.conf import settings
-from django.core.mail import EmailMessage
-from django.template.loader import render_to_string
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+from kombu.utils.json import dumps, loads
 
 logger = logging.getLogger(__name__)
 
+PENDING_EMAILS_KEY = 'emails:pending'
+EMAIL_BATCH_SIZE = 50
+
+
+@worker_ready.connect
+@worker_process_init.connect
+def warm_email_templates(**kwargs):
+    """
+    Parse every email template into the cached loader when a worker starts,
+    so the first email task doesn't pay for it.
+    """
+    # worker_process_init covers prefork children, worker_ready the gevent/solo process
+    email_dir = settings.BASE_DIR / 'templates' / 'emails'
+    for name in sorted(os.listdir(email_dir)):
+        if name.endswith('.html'):
+            get_template(f'emails/{name}')
+
+
+# Open SMTP connections kept across tasks; one per concurrently sending task at most
+_smtp_connections = queue.LifoQueue()
+
+
+@worker_process_init.connect
+def open_smtp_connection(**kwargs):
+    connection = get_connection()
+    try:
+        connection.open()
+    except OSError:
+        logger.warning('Could not pre-open SMTP connection', exc_info=True)
+        return
+    _smtp_connections.put(connection)
+
+
+@contextmanager
+def _pooled_connection():
+    try:
+        connection = _smtp_connections.get_nowait()
+    except queue.Empty:
+        connection = get_connection()
+    try:
+        connection.open()
+        yield connection
+    except Exception:
+        connection.close()
+        raise
+    _smtp_connections.put(connection)
+
+
+def _send_messages(messages):
+    """
+    Send messages over a pooled SMTP connection, reconnecting once if the
+    server dropped an idle connection.
+    """
+    try:
+        with _pooled_connection() as connection:
+            return connection.send_messages(messages)
+    except SMTPServerDisconnected:
+        with _pooled_connection() as connection:
+            return connection.send_messages(messages)
+
+
+@lru_cache(maxsize=1)
+def _email_queue():
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def build_email_html(template_name: str, context: dict) -> str:
+    """
+    Render an email template so the caller can hand finished HTML to
+    send_prebuilt_email.
+    """
+    return render_to_string(f'emails/{template_name}', context)
+
+
+def _build_email(data: dict, template_name: str, context: dict, recipient: list):
+    return _prebuilt_email(data, build_email_html(template_name, context), recipient)
+
+
+def _prebuilt_email(data: dict, html: str, recipient: list):
+    email = EmailMessage(
+        subject=data['subject'],
+        body=html,
+        from_email=settings.EMAIL_HOST_USER,
+        to=recipient,
+    )
+    email.content_subtype = 'html'
+    return email
+
+
+def queue_email(data: dict, template_name: str, context: dict, recipient: list):
+    """
+    Stage an email for the next send_email_batch run, falling back to a
+    single send task if Redis is unavailable.
+    """
+    # kombu's JSON round-trips datetimes, so templates see the same context as with .delay()
+    payload = dumps({'data': data, 'template_name': template_name, 'context': context, 'recipient': recipient})
+    try:
+        _email_queue().rpush(PENDING_EMAILS_KEY, payload)
+    except redis.RedisError:
+        logger.warning('Email staging unavailable, sending individually', exc_info=True)
+        send_email_with_template.delay(data, template_name, context, recipient)
+
+
+@shared_task(bind=True, acks_late=True, max_retries=3)
+def send_email_with_template(self, data: dict, template_name: str, context: dict, recipient: list):
+    email = _build_email(data, template_name, context, recipient)
+    try:
+        _send_messages([email])
+    except OSError as exc:
+        # SMTPException subclasses OSError, so this covers SMTP errors and dropped connections
+        logger.warning(f'Email sending failed, retrying: {str(exc)}')
+        raise self.retry(exc=exc, countdown=min(60, 2 ** self.request.retries))
+    logger.info('Email sent')
+
+
+@shared_task(bind=True, acks_late=True, max_retries=3)
+def send_prebuilt_email(self, data: dict, html: str, recipient: list):
+    """
+    Send HTML that was already rendered by build_email_html.
+    """
+    try:
+        _send_messages([_prebuilt_email(data, html, recipient)])
+    except OSError as exc:
+        logger.warning(f'Email sending failed, retrying: {str(exc)}')
+        raise self.retry(exc=exc, countdown=min(60, 2 ** self.request.retries))
+    logger.info('Email sent')
+
+
+@shared_task(acks_late=True)
+def send_email_batch(batch_size: int = EMAIL_BATCH_SIZE):
+    """
+    Send up to batch_size staged emails over a single SMTP connection.
+    """
+    staging = _email_queue()
+    # LRANGE + LTRIM in one MULTI block: LPOP with a count needs Redis 6.2
+    pipe = staging.pipeline()
+    pipe.lrange(PENDING_EMAILS_KEY, 0, batch_size - 1)
+    pipe.ltrim(PENDING_EMAILS_KEY, batch_size, -1)
+    raw, _ = pipe.execute()
+    if not raw:
+        return 0
+
+    messages = []
+    for item in raw:
+        payload = loads(item)
+        try:
+            messages.append(_build_email(**payload))
+        except Exception:
+            logger.error(f"Dropping staged email to {payload['recipient']}", exc_info=True)
+
+    try:
+        sent = _send_messages(messages)
+    except OSError:
+        # Put the batch back at the head of the list so the next run picks it up
+        staging.lpush(PENDING_EMAILS_KEY, *reversed(raw))
+        raise
+    logger.info(f'Sent {sent} staged emails')
+    return sent
+
+
 @shared_task
-def send_email_with_template(data: dict, template_name: str, context: dict, recipient: list):
-    template_name = f'emails/{template_name}'
+def generate_thumbnail(profile_id):
+    """
+    Build the thumbnail for a profile image outside the request/response cycle.
+    """
+    from .models import Profile
+
+    try:
+        profile = Profile.objects.select_related('user').get(pk=profile_id)
+    except Profile.DoesNotExist:
+        logger.warning(f'Profile {profile_id} not found, skipping thumbnail generation')
+        return
+    if profile.create_thumbnail():
+        # Queryset update: no post_save fan-out, no Profile.save bookkeeping
+        Profile.objects.filter(pk=profile_id).update(thumbnail=profile.thumbnail.name)
+        cache.delete(Profile.cache_key(profile.user_id))
+
+
+@shared_task
+def process_profile_image(profile_id, storage_key):
+    """
+    Optimize a staged profile upload, build its thumbnail and swap both onto
+    the profile, outside the request/response cycle.
+    """
+    from .models import Profile
+    from .utils import ImageProcessor
+
     try:
-        email_body = render_to_string(template_name, context)
+        try:
+            profile = Profile.objects.select_related('user').get(pk=profile_id)
+        except Profile.DoesNotExist:
+            logger.warning(f'Profile {profile_id} not found, discarding staged image')
+            return
 
-        email = EmailMessage(
-            subject=data['subject'],
-            body=email_body,
-            from_email=settings.EMAIL_HOST_USER,
-            to=recipient,
+        with default_storage.open(storage_key, 'rb') as upload:
+            optimized = ImageProcessor.optimize_image(upload, name=os.path.basename(storage_key))
+
+        old_image, old_thumbnail = profile.profile_image.name, profile.thumbnail.name
+        profile.profile_image.save(optimized.name, optimized, save=False)
+        profile.thumbnail = None
+        profile.create_thumbnail()
+
+        # Queryset update: Profile.save would re-dispatch generate_thumbnail for the new image
+        Profile.objects.filter(pk=profile_id).update(
+            profile_image=profile.profile_image.name,
+            thumbnail=profile.thumbnail.name,
         )
-        email.content_subtype = 'html'
-        email.send()
-        logger.info('Email sent')
-    except Exception as e:
-        logger.error(f'Email sending failed: {str(e)}', exc_info=True)
-        print("❌ EMAIL FAILED:", str(e))
+        profile.delete_old_images(old_image, old_thumbnail)
+        # The queryset update skips post_save, so evict here; CACHES is the shared Redis instance
+        cache.delete(Profile.cache_key(profile.user_id))
+    finally:
+        default_storage.delete(storage_key)
+
+
+@shared_task
+def sweep_expired_secure_codes():
+    """
+    Clear every expired secure code in one UPDATE.
+    """
+    from .models import User
+
+    cleared = User.objects.filter(
+        secure_code__isnull=False,
+        secure_code_expiry__lt=timezone.now(),
+    ).update(secure_code=None, secure_code_expiry=None)
+    logger.info(f'Cleared {cleared} expired secure codes')
+    return cleared
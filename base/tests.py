@@ -1,3 +1,78 @@
+from io import BytesIO
+
+from PIL import Image
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Profile, User
+from .utils import _peek_dimensions
+
+
+class ProfileManagerTests(TestCase):
+    def test_ensure_for_users_skips_existing_profiles(self):
+        users = [
+            User.objects.create_user(email=f"user{i}@example.com", username=f"user{i}", password="testpass123")
+            for i in range(3)
+        ]
+        Profile.objects.create(user=users[0], bio="existing")
+
+        Profile.objects.ensure_for_users(users)
+
+        self.assertEqual(Profile.objects.filter(user__in=users).count(), 3)
+        self.assertEqual(Profile.objects.get(user=users[0]).bio, "existing")
+
+
+class ProfileCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="cached@example.com", username="cacheduser", password="testpass123")
+        self.profile = Profile.objects.create(user=self.user, bio="before")
+        cache.set(Profile.cache_key(self.user.pk), {"bio": "before"}, 30)
+
+    def test_profile_save_evicts_cached_response(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.bio = "after"
+            self.profile.save()
+        self.assertIsNone(cache.get(Profile.cache_key(self.user.pk)))
+
+    def test_user_save_evicts_cached_response(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "Renamed"
+            self.user.save()
+        self.assertIsNone(cache.get(Profile.cache_key(self.user.pk)))
+
+
+class SecureCodeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="code@example.com", username="codeuser", password="testpass123")
+
+    def test_secure_code_is_stored_hashed(self):
+        code = self.user.generate_new_secure_code()
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.secure_code, code)
+        self.assertEqual(len(self.user.secure_code), 32)
+        self.assertTrue(self.user.secure_code_matches(code))
+        self.assertFalse(self.user.secure_code_matches("000000" if code != "000000" else "111111"))
+
+    def test_verify_user_accepts_plaintext_code(self):
+        self.user.is_verified = False
+        code = self.user.generate_new_secure_code()
+        self.user.verify_user(code)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verified)
+        self.assertIsNone(self.user.secure_code)
+
+
+class PeekDimensionsTests(TestCase):
+    def test_matches_pillow_for_supported_formats(self):
+        for image_format, mode in (('JPEG', 'RGB'), ('PNG', 'RGBA'), ('WEBP', 'RGB')):
+            buffer = BytesIO()
+            Image.new(mode, (321, 123)).save(buffer, format=image_format)
+            buffer.seek(0)
+            self.assertEqual(_peek_dimensions(buffer), (321, 123), image_format)
+            self.assertEqual(buffer.tell(), 0)
+
+    def test_returns_none_for_other_formats(self):
+        buffer = BytesIO()
+        Image.new('RGB', (10, 10)).save(buffer, format='GIF')
+        buffer.seek(0)
+        self.assertIsNone(_peek_dimensions(buffer))
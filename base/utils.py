@@ -1,8 +1,12 @@
 import base64
+import hashlib
 import logging
 import mimetypes
 import os
+import secrets
+import struct
 from email.mime.image import MIMEImage
+from functools import lru_cache
 from io import BytesIO
 
 from PIL import Image, ImageOps
@@ -10,10 +14,15 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
 from django.core.mail import EmailMultiAlternatives
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
 from django.utils.translation import gettext_lazy as _
 
 logger = logging.getLogger(__name__)
 
+# Resolved on first use (the URLconf isn't loaded at import time), then reused
+VERIFY_URL = SimpleLazyObject(lambda: settings.FRONTEND_URL + reverse('verify-user'))
+
 
 def generate_secure_code(length: int = 6) -> str:
     """
@@ -25,10 +34,42 @@ def generate_secure_code(length: int = 6) -> str:
     Returns:
         str: A random numeric code of the specified length.
     """
-    import random
-    import string
+    return f"{secrets.randbelow(10 ** length):0{length}d}"
+
+
+@lru_cache(maxsize=1)
+def _secure_code_key() -> bytes:
+    # BLAKE2s keys are capped at 32 bytes, so derive one from the configured pepper
+    return hashlib.blake2s(settings.SECURE_CODE_PEPPER.encode()).digest()
+
+
+def hash_secure_code(code: str) -> str:
+    """
+    Hash a secure code for storage.
+
+    Args:
+        code (str): The plaintext code sent to the user.
 
-    return ''.join(random.choice(string.digits) for _ in range(length))
+    Returns:
+        str: 32-character hex digest of the keyed BLAKE2s hash.
+    """
+    return hashlib.blake2s(str(code).encode(), key=_secure_code_key(), digest_size=16).hexdigest()
+
+
+def flatten_to_rgb(img):
+    """
+    Composite a transparent image onto white so it can be saved as JPEG.
+    Images without an alpha channel are returned unchanged.
+    """
+    if img.mode == 'P':
+        img = img.convert('RGBA')
+    if img.mode not in ('RGBA', 'LA'):
+        return img
+
+    background = Image.new('RGB', img.size, (255, 255, 255))
+    # getchannel copies only the alpha band; split() would copy every band
+    background.paste(img, mask=img.getchannel('A'))
+    return background
 
 
 class ImageProcessor:
@@ -48,6 +89,9 @@ class ImageProcessor:
     def validate_image(image_file):
         """
         Validate uploaded image file.
+
+        Only the header and container structure are checked; the pixel decode
+        happens in process_profile_image.
         """
         if image_file.size > ImageProcessor.MAX_FILE_SIZE:
             raise ValidationError(
@@ -58,12 +102,10 @@ class ImageProcessor:
 
         try:
             img = Image.open(image_file)
-            img.verify()
         except Exception:
             raise ValidationError(_('Invalid image file.'))
 
-        image_file.seek(0)
-        img = Image.open(image_file)
+        # Format comes from the header, so reject before paying for a decode
         if img.format not in ImageProcessor.ALLOWED_FORMATS:
             raise ValidationError(
                 _('Unsupported image format. Allowed formats: %(formats)s') % {
@@ -71,64 +113,70 @@ class ImageProcessor:
                 }
             )
 
+        try:
+            # Walks the chunks/markers for corruption without decoding pixels
+            img.verify()
+        except Exception:
+            raise ValidationError(_('Invalid image file.'))
+        finally:
+            # The upload is staged for the worker after validation
+            image_file.seek(0)
+
     @staticmethod
-    def optimize_image(image_file, max_size=(800, 800), quality=85):
+    def optimize_image(image_file, max_size=(800, 800), quality=85, name=None):
         """
         Optimize image for web use.
+
+        Accepts an uploaded file or an already-opened Image (pass name for the latter).
         """
-        img = Image.open(image_file)
+        if isinstance(image_file, Image.Image):
+            img = image_file
+        else:
+            img = Image.open(image_file)
+            name = name or image_file.name
 
-        if img.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            if img.mode == 'RGBA':
-                background.paste(img, mask=img.split()[-1])
-            else:
-                background.paste(img)
-            img = background
+        img = flatten_to_rgb(img)
 
         img = ImageOps.exif_transpose(img)
 
         if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+            # reducing_gap box-reduces by an integer factor first, so LANCZOS only runs on the last ~3x
+            img.thumbnail(max_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
 
         output = BytesIO()
         img.save(output, format='JPEG', quality=quality, optimize=True)
-        output.seek(0)
 
         # Use the original filename or generate a new one, ensuring it has a .jpg extension
-        filename = os.path.splitext(image_file.name)[0] + '.jpg'
-        return ContentFile(output.read(), name=filename)
+        filename = os.path.splitext(name)[0] + '.jpg'
+        return ContentFile(output.getvalue(), name=filename)
     @staticmethod
     def create_thumbnail(image_file, size=(150, 150), crop=True):
         """
         Create thumbnail from image.
         """
         img = Image.open(image_file)
+        if img.format == 'JPEG':
+            # Let libjpeg decode at 1/2..1/8 scale straight from the DCT coefficients
+            img.draft('RGB', (size[0] * 2, size[1] * 2))
+        img.load()
 
-        if img.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            if img.mode == 'RGBA':
-                background.paste(img, mask=img.split()[-1])
-            else:
-                background.paste(img)
-            img = background
+        img = flatten_to_rgb(img)
 
         img = ImageOps.exif_transpose(img)
 
         if crop:
+            # Integer box-reduce toward the target before the LANCZOS crop-resize
+            factor = min(img.size[0] // (size[0] * 3), img.size[1] // (size[1] * 3))
+            if factor > 1:
+                img = img.reduce(factor)
             img = ImageOps.fit(img, size, Image.Resampling.LANCZOS)
         else:
-            img.thumbnail(size, Image.Resampling.LANCZOS)
+            img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
 
         output = BytesIO()
         img.save(output, format='JPEG', quality=85, optimize=True)
-        output.seek(0)
 
-        return ContentFile(output.read())
+        return ContentFile(output.getvalue())
 
     @staticmethod
     def get_image_info(image_file):
@@ -152,12 +200,75 @@ def validate_profile_image(image):
     ImageProcessor.validate_image(image)
 
 
+# JPEG start-of-frame markers carry the dimensions (C4, C8 and CC are DHT/JPG/DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _peek_dimensions(fp):
+    """
+    Read (width, height) straight from a JPEG, PNG or WebP header.
+
+    Returns None for other formats or truncated headers so callers can fall
+    back to Image.open. The file position is restored either way.
+    """
+    start = fp.tell()
+    try:
+        head = fp.read(30)
+        if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24])
+
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP' and len(head) >= 30:
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', head[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b'VP8X':
+                return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+            return None
+
+        if head[:2] == b'\xff\xd8':
+            fp.seek(start + 2)
+            while True:
+                byte = fp.read(1)
+                if not byte:
+                    return None
+                if byte != b'\xff':
+                    continue
+                marker = fp.read(1)
+                while marker == b'\xff':
+                    marker = fp.read(1)
+                if not marker:
+                    return None
+                marker = marker[0]
+                if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+                    continue
+                segment = fp.read(2)
+                if len(segment) < 2:
+                    return None
+                length = struct.unpack('>H', segment)[0]
+                if marker in _JPEG_SOF_MARKERS:
+                    frame = fp.read(5)
+                    if len(frame) < 5:
+                        return None
+                    height, width = struct.unpack('>HH', frame[1:5])
+                    return width, height
+                fp.seek(length - 2, os.SEEK_CUR)
+        return None
+    finally:
+        fp.seek(start)
+
+
 def validate_image_aspect_ratio(image, min_ratio=0.5, max_ratio=2.0):
     """
     Validate image aspect ratio.
     """
-    img = Image.open(image)
-    ratio = img.size[0] / img.size[1]
+    size = _peek_dimensions(image)
+    if size is None:
+        size = Image.open(image).size
+    ratio = size[0] / size[1]
 
     if ratio < min_ratio or ratio > max_ratio:
         raise ValidationError(
@@ -168,6 +279,16 @@ def validate_image_aspect_ratio(image, min_ratio=0.5, max_ratio=2.0):
         )
 
 
+@lru_cache(maxsize=32)
+def _read_static_image(image_path):
+    # Email assets only change between deploys, so read each one once per process
+    full_path = os.path.join(settings.BASE_DIR / "static", image_path)
+    with open(full_path, 'rb') as img_file:
+        img_data = img_file.read()
+    img_mime_type, _ = mimetypes.guess_type(full_path)
+    return img_data, img_mime_type
+
+
 class EmailImageHandler:
     """Utility class for handling images in emails"""
 
@@ -182,12 +303,13 @@ class EmailImageHandler:
     @staticmethod
     def encode_image(image_path):
         """Convert image to base64 string"""
+        # Reads go through _read_static_image's cache; a missing file raises there, so it isn't cached
         full_path = os.path.join(settings.BASE_DIR / "static", image_path)
         try:
-            with open(full_path, "rb") as image_file:
-                return base64.b64encode(image_file.read()).decode('utf-8')
+            img_data, _ = _read_static_image(image_path)
+            return base64.b64encode(img_data).decode('utf-8')
         except FileNotFoundError:
-            print(f"Warning: Image not found at {full_path}")
+            logger.warning(f"Image not found at {full_path}")
             return None
 
     @staticmethod
@@ -196,27 +318,25 @@ class EmailImageHandler:
         full_path = os.path.join(settings.BASE_DIR / "static", image_path)
 
         try:
-            with open(full_path, 'rb') as img_file:
-                img_data = img_file.read()
-                img_mime_type, _ = mimetypes.guess_type(full_path)
+            img_data, img_mime_type = _read_static_image(image_path)
 
-                if not img_mime_type or not img_mime_type.startswith('image/'):
-                    print(f"Warning: Invalid image type for {full_path}")
-                    return False
+            if not img_mime_type or not img_mime_type.startswith('image/'):
+                logger.warning(f"Invalid image type for {full_path}")
+                return False
 
-                img_attachment = MIMEImage(img_data, _subtype=img_mime_type.split('/')[1])
+            img_attachment = MIMEImage(img_data, _subtype=img_mime_type.split('/')[1])
 
-                img_attachment.add_header('Content-ID', f'<{image_cid}>')
-                img_attachment.add_header('Content-Disposition', 'inline', filename=os.path.basename(full_path))
+            img_attachment.add_header('Content-ID', f'<{image_cid}>')
+            img_attachment.add_header('Content-Disposition', 'inline', filename=os.path.basename(full_path))
 
-                email.attach(img_attachment)
-                return True
+            email.attach(img_attachment)
+            return True
 
         except FileNotFoundError:
-            print(f"Warning: Could not attach image - {full_path} not found")
+            logger.warning(f"Could not attach image - {full_path} not found")
             return False
         except Exception as e:
-            print(f"Error attaching image {image_path}: {str(e)}")
+            logger.exception(f"Error attaching image {image_path}: {str(e)}")
             return False
 
     @classmethod
@@ -227,7 +347,7 @@ class EmailImageHandler:
             if cls.attach_inline_image(email, path, cid):
                 success_count += 1
 
-        print(f"Successfully attached {success_count}/{len(cls.DEFAULT_IMAGES)} images")
+        logger.debug(f"Attached {success_count}/{len(cls.DEFAULT_IMAGES)} images")
         return success_count
 
     @staticmethod
@@ -1,12 +1,10 @@
-from datetime import timedelta
+import logging
 
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
-from django.utils import timezone
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status, permissions
@@ -18,10 +16,11 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from base.models import Profile
 from base.serializers import RegisterSerializer, LoginSerializer, UserProfileSerializer, VerifyUserSerializer, \
     ChangePasswordSerializer, ResetPasswordSerializer, ResendVerificationCodeSerializer
-from base.tasks import send_email_with_template
-from base.utils import generate_secure_code
+from base.tasks import build_email_html, queue_email, send_prebuilt_email
+from base.utils import VERIFY_URL
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 class RegisterAPIView(GenericAPIView):
@@ -42,39 +41,37 @@ class RegisterAPIView(GenericAPIView):
         serializer.is_valid(raise_exception=True)
 
         try:
-            with transaction.atomic():
-                password = serializer.validated_data['password']
-                user = serializer.save()
-                user.set_password(password)
-
-                if not user.secure_code:
-                    user.generate_new_secure_code()
+            validated_data = serializer.validated_data
+            user = User(email=validated_data['email'], username=validated_data['username'])
+            # Hash before opening the transaction; only the single INSERT needs it
+            user.set_password(validated_data['password'])
+            secure_code = user.set_secure_code(expiry_minutes=10)
 
+            with transaction.atomic():
                 user.save()
 
-                # All database operations completed successfully
-
             # Email sending outside transaction since it's an external operation
             data = {
                 "subject": "Verify your email",
             }
             context = {
                 "email": user.email,
-                "token": user.secure_code,
+                "token": secure_code,
                 "username": user.username,
                 "expiration": user.secure_code_expiry,
                 "app_name": "ResolveMeQ",
-                "verification_link": settings.FRONTEND_URL + reverse('verify-user'),
+                "verification_link": str(VERIFY_URL),
             }
-            send_email_with_template.delay(data, 'welcome.html', context, [user.email])
-            print("Email sent to:", user.email)
-            print("With token:", user.secure_code)
+            # Staged for send_email_batch so registration bursts share SMTP connections
+            queue_email(data, 'welcome.html', context, [user.email])
+            logger.info(f"Verification email queued for user {user.pk}")
 
             return Response({
                 "Message": "Successfully registered"
             }, status=status.HTTP_201_CREATED)
 
         except Exception as e:
+            logger.exception("Registration failed")
             return Response({
                 "error": str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
@@ -118,7 +115,7 @@ class LoginAPIView(GenericAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         email = serializer.validated_data['email']
-        user = User.objects.get(email=email)
+        user = serializer.validated_data['user']
 
         if not user.is_verified:
             return Response({
@@ -218,33 +215,29 @@ class ResendVerificationCodeAPIView(GenericAPIView):
         ip_address = request.META.get('REMOTE_ADDR')
         cache_key = f"forgot_password_{ip_address}"
 
-        if cache.get(cache_key):
+        # add() only sets the key if it is absent, so check-and-set is one atomic round trip
+        if not cache.add(cache_key, True, timeout=60):
             return Response({
                 "error": "Too many requests. Please try again later."
             }, status=status.HTTP_429_TOO_MANY_REQUESTS)
 
-        cache.set(cache_key, True, timeout=60)
-
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        email = serializer.validated_data['email']
-        user = User.objects.get(email=email)
-        user.secure_code = generate_secure_code()
-        user.secure_code_expiry = timezone.now() + timedelta(minutes=10)
-        user.save(update_fields=['secure_code', 'secure_code_expiry'])
+        user = serializer.validated_data['user']
+        secure_code = user.generate_new_secure_code(expiry_minutes=10)
         data = {
             "subject": "Resend verification code",
 
         }
         context = {
             "email": user.email,
-            "token": user.secure_code,
+            "token": secure_code,
             "username": user.username,
             "expiration": user.secure_code_expiry,
             "app_name": "ResolveMeQ",
-            "verification_link": settings.FRONTEND_URL + reverse('verify_user'),
+            "verification_link": str(VERIFY_URL),
         }
-        send_email_with_template.delay(data, 'welcome.html', context, [user.email])
+        send_prebuilt_email.delay(data, build_email_html('welcome.html', context), [user.email])
         return Response({
             "message": "Verification code resent successfully."
         }, status=status.HTTP_200_OK)
@@ -257,20 +250,37 @@ class CurrentUserProfileView(GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
     serializer_class = UserProfileSerializer
+    queryset = Profile.objects.all()
+
+    def get_queryset(self):
+        return self.get_serializer_class().setup_eager_loading(super().get_queryset())
 
     def get_object(self):
-        return get_object_or_404(Profile, user=self.request.user)
+        return get_object_or_404(self.get_queryset(), user=self.request.user)
 
     def get(self, request):
-        profile = self.get_object()
-        serializer = self.get_serializer(profile)
-        return Response(serializer.data)
+        # Short TTL: absorbs the burst of profile GETs after login without serving stale data for long.
+        # Profile/User saves evict it (base.signals), as do the image tasks' queryset updates.
+        key = Profile.cache_key(request.user.pk)
+        data = cache.get(key)
+        if data is None:
+            # Cache the plain response dict, not the model: it survives model changes across deploys
+            data = dict(self.get_serializer(self.get_object()).data)
+            cache.set(key, data, 30)
+        return Response(data)
 
     def patch(self, request):
         profile = self.get_object()
         serializer = self.get_serializer(profile, data=request.data)
         if serializer.is_valid():
             serializer.save()
+            if serializer.image_pending:
+                # The new image shows up on this endpoint once process_profile_image finishes
+                return Response(
+                    serializer.data,
+                    status=status.HTTP_202_ACCEPTED,
+                    headers={'Location': request.build_absolute_uri(reverse('profile'))},
+                )
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
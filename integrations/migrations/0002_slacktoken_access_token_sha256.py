@@ -0,0 +1,36 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_tokens(apps, schema_editor):
+    SlackToken = apps.get_model('integrations', 'SlackToken')
+    tokens = list(SlackToken.objects.only('id', 'access_token'))
+    for token in tokens:
+        token.access_token_sha256 = hashlib.sha256(token.access_token.encode()).digest()
+    SlackToken.objects.bulk_update(tokens, ['access_token_sha256'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slacktoken',
+            name='access_token_sha256',
+            field=models.BinaryField(db_index=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AlterField(
+            model_name='slacktoken',
+            name='team_id',
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='slacktoken',
+            index=models.Index(fields=['-created_at'], name='slacktoken_created_idx'),
+        ),
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+    ]
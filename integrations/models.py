@@ -1,9 +1,77 @@
+import hashlib
+import time
+
+from django.core.cache import cache
 from django.db import models
 
 # Create your models here.
 
 class SlackToken(models.Model):
     access_token = models.CharField(max_length=200)
-    team_id = models.CharField(max_length=100, blank=True, null=True)
+    # SHA-256 of access_token, so lookups by token hit a fixed-width index instead of the token column
+    access_token_sha256 = models.BinaryField(max_length=32, null=True, editable=False, db_index=True)
+    team_id = models.CharField(max_length=100, blank=True, null=True, db_index=True)
     bot_user_id = models.CharField(max_length=100, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Every Slack call reads the newest token
+            models.Index(fields=['-created_at'], name='slacktoken_created_idx'),
+        ]
+
+    CURRENT_CACHE_KEY = "slack:current_token"
+    # Per-process copy in front of the shared Redis cache (settings.CACHES); short,
+    # since another process's reinstall only reaches this one through Redis
+    LOCAL_CURRENT_TTL = 30
+    # (token, monotonic expiry), swapped as one tuple so readers never see a torn pair
+    _local_current = (None, 0.0)
+
+    @staticmethod
+    def digest_token(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    @classmethod
+    def current(cls):
+        """
+        Return the newest token as a dict (access_token, team_id, bot_user_id),
+        or None if the app isn't installed. Cached for 10 minutes, and held
+        in-process for LOCAL_CURRENT_TTL seconds on top of that.
+        """
+        token, expires_at = cls._local_current
+        if token is not None and time.monotonic() < expires_at:
+            return token
+        token = cache.get(cls.CURRENT_CACHE_KEY)
+        if token is None:
+            token = cls._cache_current()
+        else:
+            cls._remember_current(token)
+        return token
+
+    @classmethod
+    def _remember_current(cls, token):
+        SlackToken._local_current = (token, time.monotonic() + cls.LOCAL_CURRENT_TTL)
+
+    @classmethod
+    def _cache_current(cls):
+        token = cls.objects.order_by("-created_at").values("access_token", "team_id", "bot_user_id").first()
+        # Don't cache a miss, so a fresh install is picked up on the next call
+        if token is None:
+            cache.delete(cls.CURRENT_CACHE_KEY)
+        else:
+            cache.set(cls.CURRENT_CACHE_KEY, token, timeout=600)
+        cls._remember_current(token)
+        return token
+
+    def save(self, *args, **kwargs):
+        if self.access_token:
+            self.access_token_sha256 = self.digest_token(self.access_token)
+        super().save(*args, **kwargs)
+        # Re-prime rather than clear, so the first Slack call after a reinstall
+        # doesn't have to go back to the database for the new token
+        self._cache_current()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self._cache_current()
+        return result
@@ -0,0 +1,191 @@
+"""
+Celery tasks that make Slack API calls outside the request/response cycle.
+"""
+
+import logging
+from functools import lru_cache
+
+import orjson
+import redis
+import requests
+from celery import shared_task
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Users with staged DMs, and the per-user list of staged message texts
+PENDING_NOTIFICATION_USERS_KEY = 'slack:notify:users'
+NOTIFICATION_KEY_PREFIX = 'slack:notify:'
+# Slack allows 50 blocks per message; each staged text takes a section plus a divider
+NOTIFICATIONS_PER_MESSAGE = 25
+
+
+SLACK_EVENT_REPLIES = {
+    "app_mention": "Hello! You mentioned me :wave:",
+    "message": "Hello from ResolveMeQ bot! :robot_face:",
+}
+
+
+@lru_cache(maxsize=1)
+def _notification_queue():
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def queue_slack_notification(user_id, text):
+    """
+    Stage a DM for the next flush_slack_notifications run, so a burst of
+    ticket updates for one user goes out as a single message. Falls back to
+    posting immediately if Redis is unavailable.
+    """
+    try:
+        pipe = _notification_queue().pipeline()
+        pipe.rpush(f'{NOTIFICATION_KEY_PREFIX}{user_id}', text)
+        pipe.sadd(PENDING_NOTIFICATION_USERS_KEY, user_id)
+        pipe.execute()
+    except redis.RedisError:
+        logger.warning('Slack notification staging unavailable, posting directly', exc_info=True)
+        send_slack_message(user_id, text)
+
+
+@shared_task
+def handle_slack_event(payload):
+    """
+    Reply to app_mentions and direct messages from the Events API.
+    Runs after slack_events has already acknowledged the event to Slack.
+    """
+    from .models import SlackToken
+    from .views import _slack_headers, _slack_session
+
+    event = payload.get("event", {})
+    text = SLACK_EVENT_REPLIES.get(event.get("type"))
+    if text is None:
+        return
+
+    token_obj = SlackToken.current()
+    # Never answer our own messages
+    if token_obj and event.get("user") != token_obj["bot_user_id"]:
+        headers = _slack_headers(token_obj)
+        reply_data = {
+            "channel": event["channel"],
+            "text": text,
+        }
+        try:
+            _slack_session.post("https://slack.com/api/chat.postMessage", headers=headers, data=orjson.dumps(reply_data))
+        except requests.exceptions.Timeout:
+            logger.warning("Timed out replying to Slack %s event", event.get("type"))
+
+
+@shared_task
+def send_slack_message(channel, text, blocks=None, thread_ts=None):
+    """
+    Post a chat message so views can return to Slack without waiting on the API.
+    """
+    from .models import SlackToken
+    from .views import _slack_headers, _slack_session
+
+    token_obj = SlackToken.current()
+    if token_obj:
+        headers = _slack_headers(token_obj)
+        message = {
+            "channel": channel,
+            "text": text,
+        }
+        if blocks:
+            message["blocks"] = blocks
+        if thread_ts:
+            message["thread_ts"] = thread_ts
+        try:
+            _slack_session.post("https://slack.com/api/chat.postMessage", headers=headers, data=orjson.dumps(message))
+        except requests.exceptions.Timeout:
+            logger.warning("Timed out posting Slack message to %s", channel)
+
+
+@shared_task
+def respond_to_slack_action(response_url, text):
+    """
+    Post a follow-up to an interactive action's response_url (valid for 30 minutes).
+    """
+    from .views import _slack_session
+
+    try:
+        _slack_session.post(response_url, json={
+            "replace_original": False,
+            "text": text,
+        })
+    except requests.exceptions.Timeout:
+        logger.warning("Timed out responding to Slack action")
+
+
+@shared_task
+def reprocess_ticket_in_thread(user_id, ticket_id, thread_ts=None):
+    """
+    Post the "working on it" message for Ask Again, then hand the ticket back to
+    the agent so its answer lands in that message's thread.
+    """
+    from tickets.tasks import process_ticket_with_agent
+    from .models import SlackToken
+    from .views import _slack_headers, _slack_session
+
+    token_obj = SlackToken.current()
+    if token_obj:
+        headers = _slack_headers(token_obj)
+        progress_msg = {
+            "channel": user_id,
+            "text": f"🔄 Working on Ticket #{ticket_id}...",
+            "thread_ts": thread_ts or None
+        }
+        try:
+            resp = _slack_session.post("https://slack.com/api/chat.postMessage", headers=headers, data=orjson.dumps(progress_msg))
+            if resp.ok:
+                thread_ts = orjson.loads(resp.content).get("ts", thread_ts)
+        except requests.exceptions.Timeout:
+            logger.warning("Timed out posting progress for ticket %s", ticket_id)
+    process_ticket_with_agent.delay(ticket_id, thread_ts)
+
+
+def _flush_user_notifications(queue, user_id):
+    key = f'{NOTIFICATION_KEY_PREFIX}{user_id}'
+    while True:
+        # Claim a message's worth of texts in one MULTI, so an overlapping flush run
+        # (the user can be re-added mid-flush) never reads texts this run is posting
+        pipe = queue.pipeline()
+        pipe.lrange(key, 0, NOTIFICATIONS_PER_MESSAGE - 1)
+        pipe.ltrim(key, NOTIFICATIONS_PER_MESSAGE, -1)
+        raw, _ = pipe.execute()
+        if not raw:
+            return
+        texts = [text.decode() for text in raw]
+        try:
+            if len(texts) == 1:
+                send_slack_message(user_id, texts[0])
+            else:
+                blocks = []
+                for text in texts:
+                    if blocks:
+                        blocks.append({"type": "divider"})
+                    blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": text}})
+                send_slack_message(user_id, f"You have {len(texts)} ticket updates.", blocks=blocks)
+        except Exception:
+            # Put the claimed texts back at the head of the list for the next run
+            queue.lpush(key, *reversed(raw))
+            raise
+        if len(raw) < NOTIFICATIONS_PER_MESSAGE:
+            return
+
+
+@shared_task
+def flush_slack_notifications(max_users=100):
+    """
+    Post each user's staged notifications as one message, with a divider between tickets.
+    """
+    queue = _notification_queue()
+    user_ids = queue.spop(PENDING_NOTIFICATION_USERS_KEY, max_users) or []
+    for raw_user_id in user_ids:
+        user_id = raw_user_id.decode()
+        try:
+            _flush_user_notifications(queue, user_id)
+        except Exception:
+            # The failed chunk was pushed back; re-flag the user for the next run
+            logger.exception("Failed to flush Slack notifications for %s", user_id)
+            queue.sadd(PENDING_NOTIFICATION_USERS_KEY, user_id)
+    return len(user_ids)
@@ -5,6 +5,7 @@ import hashlib
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.conf import settings
+from django.core.cache import cache
 
 def slack_signature(secret, body, timestamp):
     sig_basestring = f"v0:{timestamp}:{body}"
@@ -42,6 +43,53 @@ class SlackIntegrationTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertJSONEqual(response.content, {"challenge": "test_challenge"})
 
+    def test_slack_events_verifies_consecutive_requests(self):
+        # Verification keeps no state between requests
+        for challenge in ("first", "second"):
+            body = json.dumps({"type": "url_verification", "challenge": challenge})
+            response = self.client.post(
+                self.events_url,
+                data=body,
+                content_type="application/json",
+                HTTP_X_SLACK_REQUEST_TIMESTAMP=self.timestamp,
+                HTTP_X_SLACK_SIGNATURE=slack_signature(self.signing_secret, body, self.timestamp),
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertJSONEqual(response.content, {"challenge": challenge})
+
+    def _post_event(self, payload, **extra):
+        body = json.dumps(payload)
+        return self.client.post(
+            self.events_url,
+            data=body,
+            content_type="application/json",
+            HTTP_X_SLACK_REQUEST_TIMESTAMP=self.timestamp,
+            HTTP_X_SLACK_SIGNATURE=slack_signature(self.signing_secret, body, self.timestamp),
+            **extra,
+        )
+
+    def test_slack_events_acks_unhandled_event_types(self):
+        cache.delete("slack:event:Ev_REACTION")
+        response = self._post_event({
+            "type": "event_callback",
+            "event_id": "Ev_REACTION",
+            "event": {"type": "reaction_added", "user": "U123", "reaction": "thumbsup"},
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(cache.get("slack:event:Ev_REACTION"))
+
+    def test_slack_events_dedupes_redelivered_events(self):
+        cache.delete("slack:event:Ev_MENTION")
+        payload = {
+            "type": "event_callback",
+            "event_id": "Ev_MENTION",
+            "event": {"type": "app_mention", "user": "U123", "channel": "C123", "text": "hi"},
+        }
+        self.assertEqual(self._post_event(payload).status_code, 200)
+        self.assertIsNotNone(cache.get("slack:event:Ev_MENTION"))
+        retry = self._post_event(payload, HTTP_X_SLACK_RETRY_NUM="1", HTTP_X_SLACK_RETRY_REASON="http_timeout")
+        self.assertEqual(retry.status_code, 200)
+
     def test_slack_events_invalid_signature(self):
         payload = {"type": "url_verification", "challenge": "test_challenge"}
         body = json.dumps(payload)
@@ -54,6 +102,27 @@ class SlackIntegrationTests(TestCase):
         )
         self.assertEqual(response.status_code, 403)
 
+    def test_slack_events_malformed_timestamp(self):
+        body = json.dumps({"type": "url_verification", "challenge": "test_challenge"})
+        response = self.client.post(
+            self.events_url,
+            data=body,
+            content_type="application/json",
+            HTTP_X_SLACK_REQUEST_TIMESTAMP="not-a-number",
+            HTTP_X_SLACK_SIGNATURE=slack_signature(self.signing_secret, body, self.timestamp),
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_slack_events_missing_signature(self):
+        body = json.dumps({"type": "url_verification", "challenge": "test_challenge"})
+        response = self.client.post(
+            self.events_url,
+            data=body,
+            content_type="application/json",
+            HTTP_X_SLACK_REQUEST_TIMESTAMP=self.timestamp,
+        )
+        self.assertEqual(response.status_code, 403)
+
     def test_slack_slash_command_status(self):
         # Simulate a valid slash command for status
         from base.models import User
@@ -66,7 +135,7 @@ class SlackIntegrationTests(TestCase):
         data = {
             "command": "/resolvemeq",
             "text": "status",
-            "user_id": str(user.pk),  # Use a valid UUID
+            "user_id": str(user.pk),
             "trigger_id": "testtrigger",
         }
         body = "&".join([f"{k}={v}" for k, v in data.items()])
@@ -80,3 +149,55 @@ class SlackIntegrationTests(TestCase):
         )
         self.assertEqual(response.status_code, 200)
         self.assertIn("You have no tickets", response.content.decode())
+
+
+class SlackUrlConfTests(TestCase):
+    def test_every_named_pattern_round_trips(self):
+        from django.urls import resolve
+        from integrations import urls
+
+        for pattern in urls.urlpatterns:
+            url = reverse(pattern.name)
+            self.assertEqual(resolve(url).func, pattern.callback, pattern.name)
+
+
+class AgentResponseActionsTests(TestCase):
+    def test_fragment_matches_dict_encoding(self):
+        import orjson
+        from integrations.views import _agent_response_actions, _agent_response_actions_fragment
+
+        for ticket_id in (42, "7", 'quote"id'):
+            self.assertEqual(
+                orjson.dumps([_agent_response_actions_fragment(ticket_id)]),
+                orjson.dumps([_agent_response_actions(ticket_id)]),
+            )
+
+
+class SlackTokenCurrentTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from integrations.models import SlackToken
+
+        # Neither layer is rolled back with the test database; start each test cold
+        SlackToken._local_current = (None, 0.0)
+        cache.delete(SlackToken.CURRENT_CACHE_KEY)
+
+    def test_save_primes_current_token(self):
+        from django.core.cache import cache
+        from integrations.models import SlackToken
+
+        SlackToken.objects.create(access_token="xoxb-old", team_id="T1", bot_user_id="B1")
+        SlackToken.objects.create(access_token="xoxb-new", team_id="T1", bot_user_id="B1")
+        self.assertEqual(cache.get(SlackToken.CURRENT_CACHE_KEY)["access_token"], "xoxb-new")
+        with self.assertNumQueries(0):
+            self.assertEqual(SlackToken.current()["access_token"], "xoxb-new")
+
+    def test_current_reads_shared_cache_after_local_copy_expires(self):
+        from django.core.cache import cache
+        from integrations.models import SlackToken
+
+        SlackToken.objects.create(access_token="xoxb-old", team_id="T1", bot_user_id="B1")
+        # Simulate another process re-priming the shared cache after a reinstall
+        cache.set(SlackToken.CURRENT_CACHE_KEY, {"access_token": "xoxb-new", "team_id": "T1", "bot_user_id": "B1"})
+        SlackToken._local_current = (SlackToken._local_current[0], 0.0)
+        self.assertEqual(SlackToken.current()["access_token"], "xoxb-new")
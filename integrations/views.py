@@ -5,20 +5,257 @@ Handles Slack authentication, event verification, ticket creation, notifications
 
 import requests
 from django.conf import settings
-from django.http import JsonResponse, HttpResponse, HttpResponseBadRequest
+from django.core.cache import cache
+from django.db import transaction
+from django.http import JsonResponse, HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed
 from django.views.decorators.csrf import csrf_exempt
-import json
-from django.http import HttpResponse
+import orjson
 import hmac
-import hashlib
 import time
 import logging
 from .models import SlackToken
-import requests
+from .tasks import (
+    handle_slack_event,
+    queue_slack_notification,
+    reprocess_ticket_in_thread,
+    respond_to_slack_action,
+    send_slack_message,
+)
+from functools import lru_cache, wraps
+from types import MappingProxyType
 from django.views import View
 from django.utils.decorators import method_decorator
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from base.models import User
 
+logger = logging.getLogger(__name__)
+
+
+# (connect, read) seconds; a stalled slack.com must not pin a web or Celery worker
+_SLACK_TIMEOUT = (3.05, 5.0)
+# Longest Retry-After (seconds) a rate-limited Slack call will sleep for before retrying
+_RETRY_AFTER_CAP = 1.0
+
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that applies _SLACK_TIMEOUT to any request sent without an explicit timeout.
+    """
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = _SLACK_TIMEOUT
+        return super().send(request, **kwargs)
+
+
+class _CappedRetry(Retry):
+    """
+    Retry that honours Retry-After only up to _RETRY_AFTER_CAP seconds, since the
+    OAuth exchange and views.open run inside a web request (views.open within
+    Slack's 3-second trigger window).
+    """
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, _RETRY_AFTER_CAP)
+
+
+def _build_slack_session():
+    """
+    Shared HTTP session for Slack API calls, so requests reuse pooled
+    keep-alive TLS connections instead of handshaking every time.
+    """
+    session = requests.Session()
+    # Only 429s (Slack didn't process the call) and connect failures are safe to
+    # retry for POSTs. A read timeout, read error or 5xx may come after Slack already
+    # handled the call, so retrying those could post the same message twice.
+    retries = _CappedRetry(
+        total=3,
+        read=0,
+        other=0,
+        backoff_factor=0.2,
+        status_forcelist=[429],
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    )
+    session.mount("https://", _TimeoutHTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retries))
+    return session
+
+
+_slack_session = _build_slack_session()
+
+
+@lru_cache(maxsize=4)
+def _bearer_headers(access_token):
+    # Shared between callers, so hand out a read-only view
+    return MappingProxyType({
+        "Authorization": f"Bearer {access_token}",
+        "Content-Type": "application/json",
+    })
+
+
+def _slack_headers(token_obj):
+    """
+    JSON + bearer-auth headers for a SlackToken.current() entry.
+    Keyed on the token itself, so a reinstall picks up new headers with no extra invalidation.
+    """
+    return _bearer_headers(token_obj["access_token"])
+
+
+def _log_slack_post(resp, what):
+    """
+    Log a chat.postMessage result. The body is only decoded for HTTP errors,
+    or when debug logging is on (Slack reports ok=false errors with a 200).
+    """
+    if resp.status_code >= 400:
+        logger.warning("Slack %s failed: %s %s", what, resp.status_code, resp.text[:256])
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Sent %s: %s", what, resp.text)
+
+
+# Modal views are constant; build them once. Per-ticket fields are merged into a copy.
+_RESOLVEMEQ_MODAL_VIEW = {
+    "type": "modal",
+    "callback_id": "resolvemeq_modal",
+    "title": {"type": "plain_text", "text": "New IT Request"},
+    "submit": {"type": "plain_text", "text": "Submit"},
+    "close": {"type": "plain_text", "text": "Cancel"},
+    "blocks": [
+        {
+            "type": "input",
+            "block_id": "category_block",
+            "element": {
+                "type": "static_select",
+                "action_id": "category",
+                "placeholder": {"type": "plain_text", "text": "Select category"},
+                "options": [
+                    {"text": {"type": "plain_text", "text": "Wi-Fi"}, "value": "wifi"},
+                    {"text": {"type": "plain_text", "text": "Laptop"}, "value": "laptop"},
+                    {"text": {"type": "plain_text", "text": "VPN"}, "value": "vpn"},
+                    {"text": {"type": "plain_text", "text": "Printer"}, "value": "printer"},
+                    {"text": {"type": "plain_text", "text": "Email"}, "value": "email"},
+                    {"text": {"type": "plain_text", "text": "Software"}, "value": "software"},
+                    {"text": {"type": "plain_text", "text": "Hardware"}, "value": "hardware"},
+                    {"text": {"type": "plain_text", "text": "Network"}, "value": "network"},
+                    {"text": {"type": "plain_text", "text": "Account"}, "value": "account"},
+                    {"text": {"type": "plain_text", "text": "Access"}, "value": "access"},
+                    {"text": {"type": "plain_text", "text": "Phone"}, "value": "phone"},
+                    {"text": {"type": "plain_text", "text": "Server"}, "value": "server"},
+                    {"text": {"type": "plain_text", "text": "Security"}, "value": "security"},
+                    {"text": {"type": "plain_text", "text": "Cloud"}, "value": "cloud"},
+                    {"text": {"type": "plain_text", "text": "Storage"}, "value": "storage"},
+                    {"text": {"type": "plain_text", "text": "Other"}, "value": "other"},
+                ],
+            },
+            "label": {"type": "plain_text", "text": "Service Category"},
+        },
+        {
+            "type": "input",
+            "block_id": "issue_type_block",
+            "element": {
+                "type": "static_select",
+                "action_id": "issue_type",
+                "placeholder": {"type": "plain_text", "text": "Select issue type"},
+                "options": [
+                    {"text": {"type": "plain_text", "text": "Report"}, "value": "report"},
+                    {"text": {"type": "plain_text", "text": "Status"}, "value": "status"},
+                    {"text": {"type": "plain_text", "text": "Escalate"}, "value": "escalate"},
+                ],
+            },
+            "label": {"type": "plain_text", "text": "Issue Type"},
+        },
+        {
+            "type": "input",
+            "block_id": "urgency_block",
+            "element": {
+                "type": "static_select",
+                "action_id": "urgency",
+                "placeholder": {"type": "plain_text", "text": "Select urgency"},
+                "options": [
+                    {"text": {"type": "plain_text", "text": "Low"}, "value": "low"},
+                    {"text": {"type": "plain_text", "text": "Medium"}, "value": "medium"},
+                    {"text": {"type": "plain_text", "text": "High"}, "value": "high"},
+                ],
+            },
+            "label": {"type": "plain_text", "text": "Urgency"},
+        },
+        {
+            "type": "input",
+            "block_id": "description_block",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "description",
+                "multiline": True,
+            },
+            "label": {"type": "plain_text", "text": "Description"},
+        },
+        {
+            "type": "input",
+            "block_id": "screenshot_block",
+            "optional": True,
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "screenshot",
+                "placeholder": {"type": "plain_text", "text": "Paste screenshot URL (optional)"},
+            },
+            "label": {"type": "plain_text", "text": "Screenshot URL"},
+        },
+    ],
+}
+
+_CLARIFY_MODAL_VIEW = {
+    "type": "modal",
+    "callback_id": "clarify_modal",
+    "title": {"type": "plain_text", "text": "Provide More Info"},
+    "submit": {"type": "plain_text", "text": "Submit"},
+    "close": {"type": "plain_text", "text": "Cancel"},
+    "blocks": [
+        {
+            "type": "input",
+            "block_id": "description_block",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "description",
+                "multiline": True,
+            },
+            "label": {"type": "plain_text", "text": "Description (required)"},
+        },
+        {
+            "type": "input",
+            "block_id": "issue_type_block",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "issue_type",
+            },
+            "label": {"type": "plain_text", "text": "Issue Type (required)"},
+        },
+    ],
+}
+
+_FEEDBACK_TEXT_MODAL_VIEW = {
+    "type": "modal",
+    "callback_id": "feedback_text_modal",
+    "title": {"type": "plain_text", "text": "Provide Feedback"},
+    "submit": {"type": "plain_text", "text": "Send"},
+    "close": {"type": "plain_text", "text": "Cancel"},
+    "blocks": [
+        {
+            "type": "input",
+            "block_id": "feedback_block",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "feedback_text",
+                "multiline": True,
+                "placeholder": {"type": "plain_text", "text": "Type your feedback or describe your issue in detail..."}
+            },
+            "label": {"type": "plain_text", "text": "Your Feedback (required)"},
+        }
+    ]
+}
+
 @csrf_exempt
 def slack_oauth_redirect(request):
     """
@@ -49,20 +286,37 @@ def slack_oauth_redirect(request):
         "code": code,
         "redirect_uri": redirect_uri,
     }
-    resp = requests.post(token_url, data=data)
-    token_data = resp.json()
+    resp = _slack_session.post(token_url, data=data)
+    token_data = orjson.loads(resp.content)
 
     if not token_data.get("ok"):
         return HttpResponse(f"Slack OAuth failed: {token_data.get('error', 'Unknown error')}", status=400)
 
-    # Save access_token and bot_user_id
-    SlackToken.objects.create(
-        access_token=token_data["access_token"],
-        team_id=token_data.get("team", {}).get("id"),
-        bot_user_id=token_data.get("bot_user_id"),
-    )
+    # Save access_token and bot_user_id. Re-authorizing returns the same token, so replace
+    # its row (found through the digest index) rather than piling up duplicates
+    access_token = token_data["access_token"]
+    with transaction.atomic():
+        SlackToken.objects.filter(access_token_sha256=SlackToken.digest_token(access_token)).delete()
+        SlackToken.objects.create(
+            access_token=access_token,
+            team_id=token_data.get("team", {}).get("id"),
+            bot_user_id=token_data.get("bot_user_id"),
+        )
     return HttpResponse("Slack app connected!")
 
+def _field(values, block, action, selected=False, default=""):
+    """
+    Read one input from a submitted modal's state values.
+
+    selected=True reads a static_select's selected_option. A missing block or
+    empty input returns default instead of raising KeyError.
+    """
+    field = values.get(block, {}).get(action, {})
+    if selected:
+        return (field.get("selected_option") or {}).get("value", default)
+    return field.get("value") or default
+
+
 def verify_slack_request(request):
     """
     Verifies that incoming requests are genuinely from Slack using the signing secret.
@@ -75,25 +329,74 @@ def verify_slack_request(request):
     Returns:
         bool: True if the request is verified, False otherwise.
     """
-    slack_signing_secret = settings.SLACK_SIGNING_SECRET
-    request_body = request.body
-    timestamp = request.headers.get("X-Slack-Request-Timestamp")
+    # "v0=" + 64 hex chars; the format isn't secret, so reject floods of unsigned
+    # or malformed requests before any other work
     slack_signature = request.headers.get("X-Slack-Signature")
+    if not slack_signature or len(slack_signature) != 67 or not slack_signature.startswith("v0="):
+        return False
 
-    # Protect against replay attacks
-    if not timestamp or abs(time.time() - int(timestamp)) > 60 * 5:
+    # Protect against replay attacks. Slack sends plain ASCII epoch seconds; anything else
+    # (missing, signed, padded, non-ASCII digits) is a bad request, not a 500
+    timestamp = request.headers.get("X-Slack-Request-Timestamp")
+    if not timestamp or not timestamp.isascii() or not timestamp.isdigit():
+        return False
+    if abs(time.time() - int(timestamp)) > 60 * 5:
         return False
 
-    sig_basestring = f"v0:{timestamp}:{request_body.decode('utf-8')}"
-    my_signature = "v0=" + hmac.new(
-        slack_signing_secret.encode(),
-        sig_basestring.encode(),
-        hashlib.sha256
-    ).hexdigest()
+    # Read once per request; LazySettings keeps it as a plain attribute after first access
+    signing_secret = settings.SLACK_SIGNING_SECRET
+    if not signing_secret:
+        logger.error("SLACK_SIGNING_SECRET is not set; rejecting Slack request")
+        return False
+
+    try:
+        their_digest = bytes.fromhex(slack_signature[3:])
+    except ValueError:
+        return False
+
+    # Stay in bytes: no decode/re-encode of the body. hmac.digest is a single
+    # OpenSSL call, and comparing raw digests skips hex-encoding ours.
+    sig_basestring = b"v0:%b:%b" % (timestamp.encode("ascii"), request.body)
+    my_digest = hmac.digest(signing_secret.encode(), sig_basestring, "sha256")
+
+    return hmac.compare_digest(my_digest, their_digest)
+
+
+def slack_signature_required(view_func):
+    """
+    Reject POSTs that fail verify_slack_request with 403 before the view runs.
+    Other methods pass through so each view keeps its own 405 handling.
+    """
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if request.method == "POST" and not verify_slack_request(request):
+            logger.warning("Slack request to %s failed signature verification", request.path)
+            return HttpResponse(status=403)
+        return view_func(request, *args, **kwargs)
+    return _wrapped_view
+
+
+# Event types handle_slack_event answers; Slack delivers every subscribed type here
+_HANDLED = {"app_mention", "message"}
+# Slack redelivers an unacknowledged event for up to an hour (immediately, after 1 minute, after 5 minutes)
+SLACK_EVENT_DEDUP_TTL = 60 * 60
+
+
+def _wants_reply(event):
+    """
+    Whether handle_slack_event would answer this event. Checked before queuing
+    so edits, joins, bot posts and channel chatter never reach a worker.
+    """
+    if event.get("subtype") or event.get("bot_id"):
+        return False
+    if event.get("type") == "app_mention":
+        return True
+    # Plain messages are only answered in DMs; replying in channels echoes back as new events
+    return event.get("type") == "message" and event.get("channel_type") == "im"
 
-    return hmac.compare_digest(my_signature, slack_signature or "")
 
 @csrf_exempt
+@slack_signature_required
 def slack_events(request):
     """
     Handles incoming Slack event subscriptions and interactions.
@@ -109,10 +412,8 @@ def slack_events(request):
         HttpResponse: 200 OK for other events, 403 Forbidden for failed verification, 400 Bad Request for invalid payloads.
     """
     if request.method == "POST":
-        if not verify_slack_request(request):
-            return HttpResponse(status=403)
         try:
-            payload = json.loads(request.body)
+            payload = orjson.loads(request.body)
         except Exception:
             return HttpResponse(status=400)
         # Handle Slack URL verification challenge
@@ -122,82 +423,45 @@ def slack_events(request):
             return response
 
         event = payload.get("event", {})
-        # Respond to app_mention events
-        if event.get("type") == "app_mention":
-            token_obj = SlackToken.objects.order_by("-created_at").first()
-            if token_obj:
-                headers = {
-                    "Authorization": f"Bearer {token_obj.access_token}",
-                    "Content-Type": "application/json",
-                }
-                reply_data = {
-                    "channel": event["channel"],
-                    "text": "Hello! You mentioned me :wave:"
-                }
-                requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=reply_data)
-        # Handle message events
-        if event.get("type") == "message" and not event.get("bot_id"):
-            # Get the latest bot token
-            token_obj = SlackToken.objects.order_by("-created_at").first()
-            if token_obj:
-                headers = {
-                    "Authorization": f"Bearer {token_obj.access_token}",
-                    "Content-Type": "application/json",
-                }
-                reply_data = {
-                    "channel": event["channel"],
-                    "text": "Hello from ResolveMeQ bot! :robot_face:"
-                }
-                requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=reply_data)
+        if event.get("type") not in _HANDLED:
+            return HttpResponse(status=200, content_type='text/plain; charset=utf-8')
+
+        # Slack retries events that aren't acknowledged within 3 seconds, so reply from a worker.
+        # add() is atomic in the shared cache, so a redelivered event_id is only queued once.
+        event_id = payload.get("event_id")
+        if _wants_reply(event) and (
+            not event_id or cache.add(f"slack:event:{event_id}", 1, SLACK_EVENT_DEDUP_TTL)
+        ):
+            handle_slack_event.delay(payload)
         return HttpResponse(status=200, content_type='text/plain; charset=utf-8')
     return HttpResponse(status=405, content_type='text/plain; charset=utf-8')
 
 def notify_user_ticket_created(user_id, ticket_id):
     """
-    Sends a Slack DM to the user with the ticket ID after ticket creation.
+    Queues a Slack DM to the user with the ticket ID after ticket creation.
 
     Args:
         user_id (str): Slack user ID.
         ticket_id (int): Ticket ID.
     """
-    token_obj = SlackToken.objects.order_by("-created_at").first()
-    if token_obj:
-        headers = {
-            "Authorization": f"Bearer {token_obj.access_token}",
-            "Content-Type": "application/json",
-        }
-        reply_data = {
-            "channel": user_id,
-            "text": (
-                f"🎟️ Ticket #{ticket_id} created successfully! We’ll get back to you soon.\n"
-                "If you have a screenshot, please upload it here and mention your ticket number."
-            ),
-        }
-        resp = requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=reply_data)
-        print("Slack ticket created notification:", resp.text)
+    queue_slack_notification(
+        user_id,
+        f"🎟️ Ticket #{ticket_id} created successfully! We’ll get back to you soon.\n"
+        "If you have a screenshot, please upload it here and mention your ticket number.",
+    )
 
 def notify_user_ticket_resolved(user_id, ticket_id):
     """
-    Sends a Slack DM to the user when their ticket is marked as resolved.
+    Queues a Slack DM to the user when their ticket is marked as resolved.
 
     Args:
         user_id (str): Slack user ID.
         ticket_id (int): Ticket ID.
     """
-    token_obj = SlackToken.objects.order_by("-created_at").first()
-    if token_obj:
-        headers = {
-            "Authorization": f"Bearer {token_obj.access_token}",
-            "Content-Type": "application/json",
-        }
-        reply_data = {
-            "channel": user_id,
-            "text": f"🛠️ Your ticket #{ticket_id} is now marked as resolved.",
-        }
-        resp = requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=reply_data)
-        print("Slack ticket resolved notification:", resp.text)
+    queue_slack_notification(user_id, f"🛠️ Your ticket #{ticket_id} is now marked as resolved.")
 
 @csrf_exempt
+@slack_signature_required
 def slack_slash_command(request):
     """
     Handles the /resolvemeq slash command.
@@ -211,8 +475,6 @@ def slack_slash_command(request):
         JsonResponse or HttpResponse
     """
     if request.method == "POST":
-        if not verify_slack_request(request):
-            return HttpResponse(status=403)
         command = request.POST.get("command")
         text = request.POST.get("text", "").strip().lower()
         trigger_id = request.POST.get("trigger_id")
@@ -221,11 +483,16 @@ def slack_slash_command(request):
         # Handle /resolvemeq status
         if command == "/resolvemeq" and text == "status":
             from tickets.models import Ticket
-            tickets = Ticket.objects.filter(user_id=user_id).order_by("-created_at")
-            if tickets.exists():
+            # Slack users are stored with their Slack ID as username; newest 50 is plenty for a DM
+            rows = list(
+                Ticket.objects.filter(user__username=user_id)
+                .order_by("-created_at")
+                .values_list("ticket_id", "issue_type", "status")[:50]
+            )
+            if rows:
                 status_lines = [
-                    f"• Ticket #{t.ticket_id}: {t.issue_type} — {t.status.capitalize()}"
-                    for t in tickets
+                    f"• Ticket #{ticket_id}: {issue_type} — {ticket_status.capitalize()}"
+                    for ticket_id, issue_type, ticket_status in rows
                 ]
                 status_message = "*Your Tickets:*\n" + "\n".join(status_lines)
             else:
@@ -234,147 +501,45 @@ def slack_slash_command(request):
 
         # Only handle /resolvemeq (open modal)
         if command == "/resolvemeq" and not text:
-            token_obj = SlackToken.objects.order_by("-created_at").first()
+            token_obj = SlackToken.current()
             if not token_obj:
                 return JsonResponse({"text": "Bot not authorized."})
-            # Build modal view
-            modal_view = {
-                "type": "modal",
-                "callback_id": "resolvemeq_modal",
-                "title": {"type": "plain_text", "text": "New IT Request"},
-                "submit": {"type": "plain_text", "text": "Submit"},
-                "close": {"type": "plain_text", "text": "Cancel"},
-                "blocks": [
-                    {
-                        "type": "input",
-                        "block_id": "category_block",
-                        "element": {
-                            "type": "static_select",
-                            "action_id": "category",
-                            "placeholder": {"type": "plain_text", "text": "Select category"},
-                            "options": [
-                                {"text": {"type": "plain_text", "text": "Wi-Fi"}, "value": "wifi"},
-                                {"text": {"type": "plain_text", "text": "Laptop"}, "value": "laptop"},
-                                {"text": {"type": "plain_text", "text": "VPN"}, "value": "vpn"},
-                                {"text": {"type": "plain_text", "text": "Printer"}, "value": "printer"},
-                                {"text": {"type": "plain_text", "text": "Email"}, "value": "email"},
-                                {"text": {"type": "plain_text", "text": "Software"}, "value": "software"},
-                                {"text": {"type": "plain_text", "text": "Hardware"}, "value": "hardware"},
-                                {"text": {"type": "plain_text", "text": "Network"}, "value": "network"},
-                                {"text": {"type": "plain_text", "text": "Account"}, "value": "account"},
-                                {"text": {"type": "plain_text", "text": "Access"}, "value": "access"},
-                                {"text": {"type": "plain_text", "text": "Phone"}, "value": "phone"},
-                                {"text": {"type": "plain_text", "text": "Server"}, "value": "server"},
-                                {"text": {"type": "plain_text", "text": "Security"}, "value": "security"},
-                                {"text": {"type": "plain_text", "text": "Cloud"}, "value": "cloud"},
-                                {"text": {"type": "plain_text", "text": "Storage"}, "value": "storage"},
-                                {"text": {"type": "plain_text", "text": "Other"}, "value": "other"},
-                            ],
-                        },
-                        "label": {"type": "plain_text", "text": "Service Category"},
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "issue_type_block",
-                        "element": {
-                            "type": "static_select",
-                            "action_id": "issue_type",
-                            "placeholder": {"type": "plain_text", "text": "Select issue type"},
-                            "options": [
-                                {"text": {"type": "plain_text", "text": "Report"}, "value": "report"},
-                                {"text": {"type": "plain_text", "text": "Status"}, "value": "status"},
-                                {"text": {"type": "plain_text", "text": "Escalate"}, "value": "escalate"},
-                            ],
-                        },
-                        "label": {"type": "plain_text", "text": "Issue Type"},
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "urgency_block",
-                        "element": {
-                            "type": "static_select",
-                            "action_id": "urgency",
-                            "placeholder": {"type": "plain_text", "text": "Select urgency"},
-                            "options": [
-                                {"text": {"type": "plain_text", "text": "Low"}, "value": "low"},
-                                {"text": {"type": "plain_text", "text": "Medium"}, "value": "medium"},
-                                {"text": {"type": "plain_text", "text": "High"}, "value": "high"},
-                            ],
-                        },
-                        "label": {"type": "plain_text", "text": "Urgency"},
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "description_block",
-                        "element": {
-                            "type": "plain_text_input",
-                            "action_id": "description",
-                            "multiline": True,
-                        },
-                        "label": {"type": "plain_text", "text": "Description"},
-                    },
-                    {
-                        "type": "input",
-                        "block_id": "screenshot_block",
-                        "optional": True,
-                        "element": {
-                            "type": "plain_text_input",
-                            "action_id": "screenshot",
-                            "placeholder": {"type": "plain_text", "text": "Paste screenshot URL (optional)"},
-                        },
-                        "label": {"type": "plain_text", "text": "Screenshot URL"},
-                    },
-                ],
-            }
             # Open modal
-            headers = {
-                "Authorization": f"Bearer {token_obj.access_token}",
-                "Content-Type": "application/json",
-            }
+            headers = _slack_headers(token_obj)
             data = {
                 "trigger_id": trigger_id,
-                "view": modal_view,
+                "view": _RESOLVEMEQ_MODAL_VIEW,
             }
-            requests.post("https://slack.com/api/views.open", headers=headers, json=data)
+            _slack_session.post("https://slack.com/api/views.open", headers=headers, data=orjson.dumps(data))
             return HttpResponse()  # Slack expects 200 OK
         return JsonResponse({"text": "Unknown command."})
     return HttpResponse(status=405)
 
 @csrf_exempt
+@slack_signature_required
 def slack_modal_submission(request):
     """
     Handles modal submissions from Slack and creates a ticket in the backend.
     Also handles clarification modals for missing info.
     """
     if request.method == "POST":
-        if not verify_slack_request(request):
-            return HttpResponse(status=403)
-        payload = json.loads(request.POST.get("payload", "{}"))
+        payload = orjson.loads(request.POST.get("payload", "{}"))
         # Handle clarification modal
         if payload.get("type") == "view_submission" and payload.get("view", {}).get("callback_id") == "clarify_modal":
             values = payload["view"]["state"]["values"]
-            description = values["description_block"]["description"]["value"]
-            issue_type = values["issue_type_block"]["issue_type"]["value"]
+            description = _field(values, "description_block", "description")
+            issue_type = _field(values, "issue_type_block", "issue_type")
             user_id = payload["user"]["id"]
             from tickets.models import Ticket, TicketInteraction
-            ticket = Ticket.objects.filter(user__user_id=user_id, status__in=["new", "in-progress"]).order_by("-created_at").first()
+            ticket = Ticket.objects.select_related("user").filter(user__username=user_id, status__in=["new", "in-progress"]).order_by("-created_at").first()
             if not ticket:
                 # Notify user in Slack if ticket not found
-                token_obj = SlackToken.objects.order_by("-created_at").first()
-                if token_obj:
-                    headers = {
-                        "Authorization": f"Bearer {token_obj.access_token}",
-                        "Content-Type": "application/json",
-                    }
-                    requests.post("https://slack.com/api/chat.postMessage", headers=headers, json={
-                        "channel": user_id,
-                        "text": "Sorry, we couldn't find your ticket to clarify. Please try again or contact IT."
-                    })
+                send_slack_message.delay(user_id, "Sorry, we couldn't find your ticket to clarify. Please try again or contact IT.")
                 return JsonResponse({"response_action": "clear"})
             try:
                 ticket.description = description
                 ticket.issue_type = issue_type
-                ticket.save()
+                ticket.save(update_fields=["description", "issue_type", "updated_at"])
                 # Log clarification interaction
                 TicketInteraction.objects.create(
                     ticket=ticket,
@@ -387,43 +552,38 @@ def slack_modal_submission(request):
                 process_ticket_with_agent.delay(ticket.ticket_id)
             except Exception as e:
                 # Notify user in Slack if clarification fails
-                token_obj = SlackToken.objects.order_by("-created_at").first()
-                if token_obj:
-                    headers = {
-                        "Authorization": f"Bearer {token_obj.access_token}",
-                        "Content-Type": "application/json",
-                    }
-                    requests.post("https://slack.com/api/chat.postMessage", headers=headers, json={
-                        "channel": user_id,
-                        "text": f"Sorry, there was an error saving your clarification: {str(e)}"
-                    })
+                send_slack_message.delay(user_id, f"Sorry, there was an error saving your clarification: {str(e)}")
             return JsonResponse({"response_action": "clear"})
         if payload.get("type") == "view_submission" and payload.get("view", {}).get("callback_id") == "resolvemeq_modal":
             values = payload["view"]["state"]["values"]
-            category = values["category_block"]["category"]["selected_option"]["value"]
-            issue_type = values["issue_type_block"]["issue_type"]["selected_option"]["value"]
-            urgency = values["urgency_block"]["urgency"]["selected_option"]["value"]
-            description = values["description_block"]["description"]["value"]
-            screenshot = values.get("screenshot_block", {}).get("screenshot", {}).get("value", "")
+            category = _field(values, "category_block", "category", selected=True, default="other")
+            issue_type = _field(values, "issue_type_block", "issue_type", selected=True)
+            urgency = _field(values, "urgency_block", "urgency", selected=True)
+            description = _field(values, "description_block", "description")
+            screenshot = _field(values, "screenshot_block", "screenshot")
             user_id = payload["user"]["id"]
             from tickets.models import Ticket, TicketInteraction
-            user, _ = User.objects.get_or_create(username=user_id, defaults={"email": f"{user_id}@slack.local"})
-            ticket = Ticket.objects.create(
-                user=user,
-                issue_type=f"{issue_type} ({urgency})",
-                status="new",
-                description=description,
-                screenshot=screenshot,
-                category=category,
-            )
-            # Log ticket creation as an interaction
-            TicketInteraction.objects.create(
-                ticket=ticket,
-                user=user,
-                interaction_type="user_message",
-                content=f"Ticket created: {description}"
-            )
-            notify_user_ticket_created(user_id, ticket.ticket_id)
+            # One transaction for user, ticket and interaction; notify only once it commits
+            with transaction.atomic():
+                user, _ = User.objects.get_or_create(username=user_id, defaults={"email": f"{user_id}@slack.local"})
+                ticket = Ticket.objects.create(
+                    user=user,
+                    issue_type=f"{issue_type} ({urgency})",
+                    status="new",
+                    description=description,
+                    screenshot=screenshot,
+                    category=category,
+                )
+                # Log ticket creation as an interaction
+                TicketInteraction.objects.create(
+                    ticket=ticket,
+                    user=user,
+                    interaction_type="user_message",
+                    content=f"Ticket created: {description}"
+                )
+                transaction.on_commit(
+                    lambda: notify_user_ticket_created(user_id, ticket.ticket_id)
+                )
             return JsonResponse({"response_action": "clear"})
         if payload.get("type") == "view_submission" and payload.get("view", {}).get("callback_id") == "feedback_text_modal":
             ticket_id = payload["view"].get("private_metadata")
@@ -431,29 +591,18 @@ def slack_modal_submission(request):
             user_id = payload["user"]["id"]
             from tickets.models import Ticket, TicketInteraction
             try:
-                ticket = Ticket.objects.get(ticket_id=ticket_id)
+                # Only the owner's id is needed to log the interaction
+                owner_id = Ticket.objects.values_list("user_id", flat=True).get(ticket_id=ticket_id)
                 TicketInteraction.objects.create(
-                    ticket=ticket,
-                    user=ticket.user,
+                    ticket_id=ticket_id,
+                    user_id=owner_id,
                     interaction_type="feedback",
                     content=f"User feedback: {feedback}"
                 )
                 # Send confirmation to user
-                token_obj = SlackToken.objects.order_by("-created_at").first()
-                if token_obj:
-                    headers = {
-                        "Authorization": f"Bearer {token_obj.access_token}",
-                        "Content-Type": "application/json",
-                    }
-                    requests.post("https://slack.com/api/chat.postMessage", headers=headers, json={
-                        "channel": user_id,
-                        "text": "Thank you for your feedback! Our IT team will review it shortly."
-                    })
-                # (Optional) Notify IT staff (e.g., send to a channel)
-                # requests.post("https://slack.com/api/chat.postMessage", headers=headers, json={
-                #     "channel": "#it-support",
-                #     "text": f"New feedback for Ticket #{ticket_id}: {feedback}"
-                # })
+                send_slack_message.delay(user_id, "Thank you for your feedback! Our IT team will review it shortly.")
+                # (Optional) Notify IT staff (e.g., send to a channel) through the pooled session in the worker:
+                # send_slack_message.delay("#it-support", f"New feedback for Ticket #{ticket_id}: {feedback}")
             except Exception:
                 pass
             return JsonResponse({"response_action": "clear"})
@@ -461,314 +610,105 @@ def slack_modal_submission(request):
     return HttpResponse(status=405)
 
 # --- Unified Slack Interactive Endpoint ---
-from django.utils.decorators import method_decorator
-from django.views import View
-from django.views.decorators.csrf import csrf_exempt
-
 @method_decorator(csrf_exempt, name="dispatch")
 class SlackInteractiveActionView(View):
     """
     Unified handler for all Slack interactive events (buttons, selects, modals).
     Set your Slack Interactivity Request URL to /api/integrations/slack/actions/
     """
+    # action_id -> (value prefix, handler); handlers get the payload and the ticket id from the value
+    ACTION_HANDLERS = {
+        "ask_again": ("ask_again_", "handle_ask_again"),
+        "resolve_ticket": ("resolve_", "handle_resolve"),
+        "feedback_positive": ("feedback_positive_", "handle_feedback"),
+        "feedback_negative": ("feedback_negative_", "handle_feedback"),
+        "clarify_ticket": ("clarify_", "handle_clarify"),
+        "cancel_ticket": ("cancel_", "handle_cancel"),
+        "escalate_ticket": ("escalate_", "handle_escalate"),
+        "feedback_text": ("feedback_", "handle_feedback_text"),
+        "agent_response_overflow": ("", "handle_overflow"),
+    }
+    # Agent-response overflow options, routed by value prefix to the handlers of the buttons they replaced
+    OVERFLOW_HANDLERS = {
+        "clarify_": "handle_clarify",
+        "escalate_": "handle_escalate",
+        "feedback_": "handle_feedback_text",
+    }
+
     def dispatch(self, request, *args, **kwargs):
-        from django.http import HttpResponseNotAllowed
         if request.method.lower() != 'post':
             return HttpResponseNotAllowed(['POST'])
         return super().dispatch(request, *args, **kwargs)
 
+    @method_decorator(slack_signature_required)
     def post(self, request, *args, **kwargs):
-        import logging
-        logger = logging.getLogger(__name__)
-        if not verify_slack_request(request):
-            logger.warning("Slack interactive POST forbidden: signature verification failed. Headers: %s, Body: %s", dict(request.headers), request.body)
-            return HttpResponse(status=403)
         try:
-            payload = json.loads(request.POST.get("payload", "{}"))
+            payload = orjson.loads(request.POST.get("payload", "{}"))
         except Exception:
             return HttpResponse(status=400)
         payload_type = payload.get("type")
         # Handle block_actions (button/select)
         if payload_type == "block_actions":
             actions = payload.get("actions", [])
-            user_id = payload.get("user", {}).get("id")
-            response_url = payload.get("response_url")
-            thread_ts = payload.get("message", {}).get("ts")
             if actions:
                 action = actions[0]
-                action_id = action.get("action_id")
-                value = action.get("value", "")
-                # Handle "Ask Again"
-                if action_id == "ask_again" and value.startswith("ask_again_"):
-                    ticket_id = value.replace("ask_again_", "")
-                    from tickets.tasks import process_ticket_with_agent
-                    # Post progress update in thread
-                    token_obj = SlackToken.objects.order_by("-created_at").first()
-                    if token_obj:
-                        headers = {
-                            "Authorization": f"Bearer {token_obj.access_token}",
-                            "Content-Type": "application/json",
-                        }
-                        progress_msg = {
-                            "channel": user_id,
-                            "text": f"🔄 Working on Ticket #{ticket_id}...",
-                            "thread_ts": thread_ts or None
-                        }
-                        resp = requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=progress_msg)
-                        if resp.ok:
-                            progress_data = resp.json()
-                            thread_ts = progress_data.get("ts", thread_ts)
-                    # Pass thread_ts to Celery task
-                    process_ticket_with_agent.delay(ticket_id, thread_ts)
-                    requests.post(response_url, json={
-                        "replace_original": False,
-                        "text": f"🔄 Ticket #{ticket_id} is being reprocessed by the agent."
-                    })
-                    return HttpResponse()
-                # Handle "Mark as Resolved"
-                elif action_id == "resolve_ticket" and value.startswith("resolve_"):
-                    ticket_id = value.replace("resolve_", "")
-                    from tickets.models import Ticket
-                    try:
-                        ticket = Ticket.objects.get(ticket_id=ticket_id)
-                        ticket.status = "resolved"
-                        ticket.save()
-                        notify_user_ticket_resolved(user_id, ticket_id)
-                        # Prompt for feedback
-                        token_obj = SlackToken.objects.order_by("-created_at").first()
-                        if token_obj:
-                            headers = {
-                                "Authorization": f"Bearer {token_obj.access_token}",
-                                "Content-Type": "application/json",
-                            }
-                            feedback_blocks = [
-                                {
-                                    "type": "section",
-                                    "text": {"type": "mrkdwn", "text": f"How helpful was the agent's response for Ticket #{ticket_id}?"}
-                            },
-                            {
-                                "type": "actions",
-                                "elements": [
-                                    {
-                                        "type": "button",
-                                        "text": {"type": "plain_text", "text": "👍 Helpful"},
-                                        "value": f"feedback_positive_{ticket_id}",
-                                        "action_id": "feedback_positive"
-                                    },
-                                    {
-                                        "type": "button",
-                                        "text": {"type": "plain_text", "text": "👎 Not Helpful"},
-                                        "value": f"feedback_negative_{ticket_id}",
-                                        "action_id": "feedback_negative"
-                                    }
-                                ]
-                            }
-                        ]
-                            requests.post("https://slack.com/api/chat.postMessage", headers=headers, json={
-                                "channel": user_id,
-                                "blocks": feedback_blocks,
-                                "text": "Please rate the agent's response."
-                            })
-                        requests.post(response_url, json={
-                            "replace_original": False,
-                            "text": f"✅ Ticket #{ticket_id} marked as resolved."
-                        })
-                    except Ticket.DoesNotExist:
-                        requests.post(response_url, json={
-                            "replace_original": False,
-                            "text": f"❌ Ticket #{ticket_id} not found."
-                        })
-                    return HttpResponse()
-                # Handle feedback buttons
-                elif action_id in ("feedback_positive", "feedback_negative"):
-                    feedback = "helpful" if action_id == "feedback_positive" else "not helpful"
-                    ticket_id = value.split("_")[-1]
-                    # Log feedback as TicketInteraction
-                    from tickets.models import Ticket, TicketInteraction
-                    try:
-                        ticket = Ticket.objects.get(ticket_id=ticket_id)
-                        TicketInteraction.objects.create(
-                            ticket=ticket,
-                            user=ticket.user,
-                            interaction_type="feedback",
-                            content=f"User marked agent response as: {feedback}"
-                        )
-                        # Sync to knowledge base if resolved and has agent response
-                        ticket.sync_to_knowledge_base()
-                    except Exception:
-                        pass
-                    requests.post(response_url, json={
-                        "replace_original": False,
-                        "text": f"Thank you for your feedback on Ticket #{ticket_id}: *{feedback}*."
-                    })
-                    return HttpResponse()
-                # Handle clarification prompt
-                elif action_id == "clarify_ticket" and value.startswith("clarify_"):
-                    ticket_id = value.replace("clarify_", "")
-                    # Open a modal for the user to provide more info
-                    token_obj = SlackToken.objects.order_by("-created_at").first()
-                    if token_obj:
-                        headers = {
-                            "Authorization": f"Bearer {token_obj.access_token}",
-                            "Content-Type": "application/json",
-                        }
-                        modal_view = {
-                            "type": "modal",
-                            "callback_id": "clarify_modal",
-                            "title": {"type": "plain_text", "text": "Provide More Info"},
-                            "submit": {"type": "plain_text", "text": "Submit"},
-                            "close": {"type": "plain_text", "text": "Cancel"},
-                            "private_metadata": ticket_id,
-                            "blocks": [
-                                {
-                                    "type": "input",
-                                    "block_id": "description_block",
-                                    "element": {
-                                        "type": "plain_text_input",
-                                        "action_id": "description",
-                                        "multiline": True,
-                                    },
-                                    "label": {"type": "plain_text", "text": "Description (required)"},
-                                },
-                                {
-                                    "type": "input",
-                                    "block_id": "issue_type_block",
-                                    "element": {
-                                        "type": "plain_text_input",
-                                        "action_id": "issue_type",
-                                    },
-                                    "label": {"type": "plain_text", "text": "Issue Type (required)"},
-                                },
-                            ],
-                        }
-                        trigger_id = payload.get("trigger_id")
-                        data = {
-                            "trigger_id": trigger_id,
-                            "view": modal_view,
-                        }
-                        requests.post("https://slack.com/api/views.open", headers=headers, json=data)
-                    return HttpResponse()
-                elif action_id == "cancel_ticket" and value.startswith("cancel_"):
-                    ticket_id = value.replace("cancel_", "")
-                    requests.post(response_url, json={
-                        "replace_original": False,
-                        "text": f"❌ Ticket #{ticket_id} update cancelled."
-                    })
-                    return HttpResponse()
-                # Handle "Escalate" action
-                elif action_id == "escalate_ticket" and value.startswith("escalate_"):
-                    ticket_id = value.replace("escalate_", "")
-                    from tickets.models import Ticket, TicketInteraction
-                    try:
-                        ticket = Ticket.objects.get(ticket_id=ticket_id)
-                        TicketInteraction.objects.create(
-                            ticket=ticket,
-                            user=ticket.user,
-                            interaction_type="user_message",
-                            content="User requested escalation via Slack."
-                        )
-                        # Optionally, notify admins or escalation channel here
-                    except Exception:
-                        pass
-                    requests.post(response_url, json={
-                        "replace_original": False,
-                        "text": f"🚨 Ticket #{ticket_id} has been escalated. An IT admin will review it shortly."
-                    })
-                    return HttpResponse()
-                # Handle feedback text button
-                elif action_id == "feedback_text" and value.startswith("feedback_"):
-                    ticket_id = value.replace("feedback_", "")
-                    token_obj = SlackToken.objects.order_by("-created_at").first()
-                    if token_obj:
-                        headers = {
-                            "Authorization": f"Bearer {token_obj.access_token}",
-                            "Content-Type": "application/json",
-                        }
-                        modal_view = {
-                            "type": "modal",
-                            "callback_id": "feedback_text_modal",
-                            "title": {"type": "plain_text", "text": "Provide Feedback"},
-                            "submit": {"type": "plain_text", "text": "Send"},
-                            "close": {"type": "plain_text", "text": "Cancel"},
-                            "private_metadata": ticket_id,
-                            "blocks": [
-                                {
-                                    "type": "input",
-                                    "block_id": "feedback_block",
-                                    "element": {
-                                        "type": "plain_text_input",
-                                        "action_id": "feedback_text",
-                                        "multiline": True,
-                                        "placeholder": {"type": "plain_text", "text": "Type your feedback or describe your issue in detail..."}
-                                    },
-                                    "label": {"type": "plain_text", "text": "Your Feedback (required)"},
-                                }
-                            ]
-                        }
-                        trigger_id = payload.get("trigger_id")
-                        data = {
-                            "trigger_id": trigger_id,
-                            "view": modal_view,
-                        }
-                        requests.post("https://slack.com/api/views.open", headers=headers, json=data)
-                    return HttpResponse()
+                # Buttons carry a value; overflow menus report the chosen option instead
+                value = action.get("value") or (action.get("selected_option") or {}).get("value", "")
+                prefix, handler_name = self.ACTION_HANDLERS.get(action.get("action_id"), (None, None))
+                if handler_name and value.startswith(prefix):
+                    return getattr(self, handler_name)(payload, value[len(prefix):])
         # Handle view_submission (modal)
         elif payload_type == "view_submission":
             callback_id = payload.get("view", {}).get("callback_id")
             # --- Ticket creation modal ---
             if callback_id == "resolvemeq_modal":
                 values = payload["view"]["state"]["values"]
-                category = values["category_block"]["category"]["selected_option"]["value"]
-                issue_type = values["issue_type_block"]["issue_type"]["selected_option"]["value"]
-                urgency = values["urgency_block"]["urgency"]["selected_option"]["value"]
-                description = values["description_block"]["description"]["value"]
-                screenshot = values.get("screenshot_block", {}).get("screenshot", {}).get("value", "")
+                category = _field(values, "category_block", "category", selected=True, default="other")
+                issue_type = _field(values, "issue_type_block", "issue_type", selected=True)
+                urgency = _field(values, "urgency_block", "urgency", selected=True)
+                description = _field(values, "description_block", "description")
+                screenshot = _field(values, "screenshot_block", "screenshot")
                 user_id = payload["user"]["id"]
                 from tickets.models import Ticket, TicketInteraction
-                user, _ = User.objects.get_or_create(username=user_id, defaults={"email": f"{user_id}@slack.local"})
-                ticket = Ticket.objects.create(
-                    user=user,
-                    issue_type=f"{issue_type} ({urgency})",
-                    status="new",
-                    description=description,
-                    screenshot=screenshot,
-                    category=category,
-                )
-                TicketInteraction.objects.create(
-                    ticket=ticket,
-                    user=user,
-                    interaction_type="user_message",
-                    content=f"Ticket created: {description}"
-                )
-                notify_user_ticket_created(user_id, ticket.ticket_id)
+                # One transaction for user, ticket and interaction; notify only once it commits
+                with transaction.atomic():
+                    user, _ = User.objects.get_or_create(username=user_id, defaults={"email": f"{user_id}@slack.local"})
+                    ticket = Ticket.objects.create(
+                        user=user,
+                        issue_type=f"{issue_type} ({urgency})",
+                        status="new",
+                        description=description,
+                        screenshot=screenshot,
+                        category=category,
+                    )
+                    TicketInteraction.objects.create(
+                        ticket=ticket,
+                        user=user,
+                        interaction_type="user_message",
+                        content=f"Ticket created: {description}"
+                    )
+                    transaction.on_commit(
+                        lambda: notify_user_ticket_created(user_id, ticket.ticket_id)
+                    )
                 return JsonResponse({"response_action": "clear"})
             # --- Clarification modal ---
             elif callback_id == "clarify_modal":
                 ticket_id = payload["view"].get("private_metadata")
                 values = payload["view"]["state"]["values"]
-                description = values["description_block"]["description"]["value"]
-                issue_type = values["issue_type_block"]["issue_type"]["value"]
+                description = _field(values, "description_block", "description")
+                issue_type = _field(values, "issue_type_block", "issue_type")
                 user_id = payload["user"]["id"]
                 from tickets.models import Ticket, TicketInteraction
                 try:
-                    ticket = Ticket.objects.get(ticket_id=ticket_id)
+                    ticket = Ticket.objects.select_related("user").get(ticket_id=ticket_id)
                 except Ticket.DoesNotExist:
                     # Notify user in Slack if ticket not found
-                    token_obj = SlackToken.objects.order_by("-created_at").first()
-                    if token_obj:
-                        headers = {
-                            "Authorization": f"Bearer {token_obj.access_token}",
-                            "Content-Type": "application/json",
-                        }
-                        requests.post("https://slack.com/api/chat.postMessage", headers=headers, json={
-                            "channel": user_id,
-                            "text": "Sorry, we couldn't find your ticket to clarify. Please try again or contact IT."
-                        })
+                    send_slack_message.delay(user_id, "Sorry, we couldn't find your ticket to clarify. Please try again or contact IT.")
                     return JsonResponse({"response_action": "clear"})
                 try:
                     ticket.description = description
                     ticket.issue_type = issue_type
-                    ticket.save()
+                    ticket.save(update_fields=["description", "issue_type", "updated_at"])
                     TicketInteraction.objects.create(
                         ticket=ticket,
                         user=ticket.user,
@@ -779,16 +719,7 @@ class SlackInteractiveActionView(View):
                     process_ticket_with_agent.delay(ticket.ticket_id)
                 except Exception as e:
                     # Notify user in Slack if clarification fails
-                    token_obj = SlackToken.objects.order_by("-created_at").first()
-                    if token_obj:
-                        headers = {
-                            "Authorization": f"Bearer {token_obj.access_token}",
-                            "Content-Type": "application/json",
-                        }
-                        requests.post("https://slack.com/api/chat.postMessage", headers=headers, json={
-                            "channel": user_id,
-                            "text": f"Sorry, there was an error saving your clarification: {str(e)}"
-                        })
+                    send_slack_message.delay(user_id, f"Sorry, there was an error saving your clarification: {str(e)}")
                 return JsonResponse({"response_action": "clear"})
             # --- Feedback text modal ---
             elif callback_id == "feedback_text_modal":
@@ -797,29 +728,18 @@ class SlackInteractiveActionView(View):
                 user_id = payload["user"]["id"]
                 from tickets.models import Ticket, TicketInteraction
                 try:
-                    ticket = Ticket.objects.get(ticket_id=ticket_id)
+                    # Only the owner's id is needed to log the interaction
+                    owner_id = Ticket.objects.values_list("user_id", flat=True).get(ticket_id=ticket_id)
                     TicketInteraction.objects.create(
-                        ticket=ticket,
-                        user=ticket.user,
+                        ticket_id=ticket_id,
+                        user_id=owner_id,
                         interaction_type="feedback",
                         content=f"User feedback: {feedback}"
                     )
                     # Send confirmation to user
-                    token_obj = SlackToken.objects.order_by("-created_at").first()
-                    if token_obj:
-                        headers = {
-                            "Authorization": f"Bearer {token_obj.access_token}",
-                            "Content-Type": "application/json",
-                        }
-                        requests.post("https://slack.com/api/chat.postMessage", headers=headers, json={
-                            "channel": user_id,
-                            "text": "Thank you for your feedback! Our IT team will review it shortly."
-                        })
-                    # (Optional) Notify IT staff (e.g., send to a channel)
-                    # requests.post("https://slack.com/api/chat.postMessage", headers=headers, json={
-                    #     "channel": "#it-support",
-                    #     "text": f"New feedback for Ticket #{ticket_id}: {feedback}"
-                    # })
+                    send_slack_message.delay(user_id, "Thank you for your feedback! Our IT team will review it shortly.")
+                    # (Optional) Notify IT staff (e.g., send to a channel) through the pooled session in the worker:
+                    # send_slack_message.delay("#it-support", f"New feedback for Ticket #{ticket_id}: {feedback}")
                 except Exception:
                     pass
                 return JsonResponse({"response_action": "clear"})
@@ -828,6 +748,179 @@ class SlackInteractiveActionView(View):
         # Always return 200 OK for unknown or unhandled payloads
         return HttpResponse(status=200)
 
+    def handle_ask_again(self, payload, ticket_id):
+        # The progress message and the agent run both happen in the worker
+        respond_to_slack_action.delay(payload.get("response_url"), f"🔄 Ticket #{ticket_id} is being reprocessed by the agent.")
+        reprocess_ticket_in_thread.delay(payload.get("user", {}).get("id"), ticket_id, payload.get("message", {}).get("ts"))
+        return HttpResponse()
+
+    def handle_overflow(self, payload, value):
+        for prefix, handler_name in self.OVERFLOW_HANDLERS.items():
+            if value.startswith(prefix):
+                return getattr(self, handler_name)(payload, value[len(prefix):])
+        return HttpResponse()
+
+    def handle_resolve(self, payload, ticket_id):
+        from tickets.models import Ticket
+        user_id = payload.get("user", {}).get("id")
+        response_url = payload.get("response_url")
+        try:
+            ticket = Ticket.objects.select_related("user").get(ticket_id=ticket_id)
+            ticket.status = "resolved"
+            ticket.save(update_fields=["status", "updated_at"])
+            notify_user_ticket_resolved(user_id, ticket_id)
+            # Prompt for feedback
+            feedback_blocks = [
+                {
+                    "type": "section",
+                    "text": {"type": "mrkdwn", "text": f"How helpful was the agent's response for Ticket #{ticket_id}?"}
+                },
+                {
+                    "type": "actions",
+                    "elements": [
+                        {
+                            "type": "button",
+                            "text": {"type": "plain_text", "text": "👍 Helpful"},
+                            "value": f"feedback_positive_{ticket_id}",
+                            "action_id": "feedback_positive"
+                        },
+                        {
+                            "type": "button",
+                            "text": {"type": "plain_text", "text": "👎 Not Helpful"},
+                            "value": f"feedback_negative_{ticket_id}",
+                            "action_id": "feedback_negative"
+                        }
+                    ]
+                }
+            ]
+            send_slack_message.delay(user_id, "Please rate the agent's response.", blocks=feedback_blocks)
+            respond_to_slack_action.delay(response_url, f"✅ Ticket #{ticket_id} marked as resolved.")
+        except Ticket.DoesNotExist:
+            respond_to_slack_action.delay(response_url, f"❌ Ticket #{ticket_id} not found.")
+        return HttpResponse()
+
+    def handle_feedback(self, payload, ticket_id):
+        action_id = payload["actions"][0]["action_id"]
+        feedback = "helpful" if action_id == "feedback_positive" else "not helpful"
+        # Log feedback as TicketInteraction
+        from tickets.models import Ticket, TicketInteraction
+        try:
+            ticket = Ticket.objects.select_related("user").get(ticket_id=ticket_id)
+            TicketInteraction.objects.create(
+                ticket=ticket,
+                user=ticket.user,
+                interaction_type="feedback",
+                content=f"User marked agent response as: {feedback}"
+            )
+            # Sync to knowledge base if resolved and has agent response
+            ticket.sync_to_knowledge_base()
+        except Exception:
+            pass
+        respond_to_slack_action.delay(payload.get("response_url"), f"Thank you for your feedback on Ticket #{ticket_id}: *{feedback}*.")
+        return HttpResponse()
+
+    def handle_clarify(self, payload, ticket_id):
+        # Open a modal for the user to provide more info
+        return self._open_modal(payload, {**_CLARIFY_MODAL_VIEW, "private_metadata": ticket_id})
+
+    def handle_cancel(self, payload, ticket_id):
+        respond_to_slack_action.delay(payload.get("response_url"), f"❌ Ticket #{ticket_id} update cancelled.")
+        return HttpResponse()
+
+    def handle_escalate(self, payload, ticket_id):
+        from tickets.models import Ticket, TicketInteraction
+        try:
+            owner_id = Ticket.objects.values_list("user_id", flat=True).get(ticket_id=ticket_id)
+            TicketInteraction.objects.create(
+                ticket_id=ticket_id,
+                user_id=owner_id,
+                interaction_type="user_message",
+                content="User requested escalation via Slack."
+            )
+            # Optionally, notify admins or escalation channel here
+        except Exception:
+            pass
+        respond_to_slack_action.delay(payload.get("response_url"), f"🚨 Ticket #{ticket_id} has been escalated. An IT admin will review it shortly.")
+        return HttpResponse()
+
+    def handle_feedback_text(self, payload, ticket_id):
+        return self._open_modal(payload, {**_FEEDBACK_TEXT_MODAL_VIEW, "private_metadata": ticket_id})
+
+    def _open_modal(self, payload, modal_view):
+        # views.open stays in the request: the trigger_id expires 3 seconds after the click
+        token_obj = SlackToken.current()
+        if token_obj:
+            headers = _slack_headers(token_obj)
+            data = {
+                "trigger_id": payload.get("trigger_id"),
+                "view": modal_view,
+            }
+            _slack_session.post("https://slack.com/api/views.open", headers=headers, data=orjson.dumps(data))
+        return HttpResponse()
+
+# Action row under every agent response: the primary button, with the rest in an
+# overflow menu. Only each value varies per ticket.
+_AGENT_RESPONSE_RESOLVE_BUTTON = {
+    "type": "button",
+    "text": {"type": "plain_text", "text": "✅ Mark as Resolved"},
+    "style": "primary",
+    "action_id": "resolve_ticket"
+}
+_AGENT_RESPONSE_OVERFLOW_OPTIONS = (
+    ("clarify_", {"type": "plain_text", "text": "✏️ Clarify"}),
+    ("escalate_", {"type": "plain_text", "text": "🚨 Escalate"}),
+    ("feedback_", {"type": "plain_text", "text": "💬 Feedback"}),
+)
+
+
+def _agent_response_actions(ticket_id):
+    """
+    Actions block for an agent response, sharing the constant button and option parts.
+    """
+    return {
+        "type": "actions",
+        "elements": [
+            {**_AGENT_RESPONSE_RESOLVE_BUTTON, "value": f"resolve_{ticket_id}"},
+            {
+                "type": "overflow",
+                "action_id": "agent_response_overflow",
+                "options": [
+                    {"text": text, "value": f"{prefix}{ticket_id}"}
+                    for prefix, text in _AGENT_RESPONSE_OVERFLOW_OPTIONS
+                ],
+            },
+        ],
+    }
+
+
+_TICKET_ID_PLACEHOLDER = b"__TICKET_ID__"
+# The actions block pre-encoded once; per message only the ticket id is spliced in
+_AGENT_RESPONSE_ACTIONS_JSON = orjson.dumps(_agent_response_actions(_TICKET_ID_PLACEHOLDER.decode()))
+
+
+def _agent_response_actions_fragment(ticket_id):
+    """
+    Same JSON as _agent_response_actions(ticket_id), as an orjson.Fragment so
+    orjson.dumps copies it into the payload instead of re-encoding the buttons.
+    """
+    # Escape the id as it would appear inside a JSON string
+    escaped_id = orjson.dumps(str(ticket_id))[1:-1]
+    return orjson.Fragment(_AGENT_RESPONSE_ACTIONS_JSON.replace(_TICKET_ID_PLACEHOLDER, escaped_id))
+
+
+def _mrkdwn_section(text):
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
+
+_RECOMMENDATIONS_HEADER = _mrkdwn_section("*Recommendations:*")
+
+
+@lru_cache(maxsize=128)
+def _response_label(key):
+    # Agent responses reuse a small set of keys, e.g. "resolution_steps" -> "Resolution steps"
+    return key.replace("_", " ").capitalize()
+
+
 def notify_user_agent_response(user_id, ticket_id, agent_response, thread_ts=None):
     """
     Sends the agent's analysis and recommendations to the user via Slack DM, with interactive buttons.
@@ -837,70 +930,32 @@ def notify_user_agent_response(user_id, ticket_id, agent_response, thread_ts=Non
         agent_response (dict): The response from the agent (should be a dict, not JSON string).
         thread_ts (str, optional): Slack thread timestamp to reply in thread.
     """
-    from .models import SlackToken
-    import requests
-    import json
-    token_obj = SlackToken.objects.order_by("-created_at").first()
+    token_obj = SlackToken.current()
     if not token_obj:
         return
-    headers = {
-        "Authorization": f"Bearer {token_obj.access_token}",
-        "Content-Type": "application/json",
-    }
+    headers = _slack_headers(token_obj)
     # Format the agent response for Slack
     if isinstance(agent_response, str):
         try:
-            agent_response = json.loads(agent_response)
+            agent_response = orjson.loads(agent_response)
         except Exception:
             agent_response = {"analysis": {}, "recommendations": {}}
     analysis = agent_response.get("analysis", {})
     recommendations = agent_response.get("recommendations", {})
     # Build Slack blocks
-    blocks = [
-        {"type": "section", "text": {"type": "mrkdwn", "text": f"🤖 *Agent Analysis for Ticket #{ticket_id}*"}},
-    ]
+    blocks = [_mrkdwn_section(f"🤖 *Agent Analysis for Ticket #{ticket_id}*")]
     if analysis:
-        for k, v in analysis.items():
-            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*{k.replace('_',' ').capitalize()}:* {v}"}})
+        blocks.extend(_mrkdwn_section(f"*{_response_label(k)}:* {v}") for k, v in analysis.items())
     if recommendations:
-        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": "*Recommendations:*"}})
+        blocks.append(_RECOMMENDATIONS_HEADER)
         for k, v in recommendations.items():
             if isinstance(v, list):
-                blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*{k.replace('_',' ').capitalize()}:*\n- " + "\n- ".join(v)}})
+                # One join per list; items may be numbers or None as well as strings
+                blocks.append(_mrkdwn_section(f"*{_response_label(k)}:*\n- " + "\n- ".join(map(str, v))))
             else:
-                blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*{k.replace('_',' ').capitalize()}:* {v}"}})
+                blocks.append(_mrkdwn_section(f"*{_response_label(k)}:* {v}"))
     # Add interactive buttons
-    blocks.append({
-        "type": "actions",
-        "elements": [
-            {
-                "type": "button",
-                "text": {"type": "plain_text", "text": "✅ Mark as Resolved"},
-                "style": "primary",
-                "value": f"resolve_{ticket_id}",
-                "action_id": "resolve_ticket"
-            },
-            {
-                "type": "button",
-                "text": {"type": "plain_text", "text": "✏️ Clarify"},
-                "value": f"clarify_{ticket_id}",
-                "action_id": "clarify_ticket"
-            },
-            {
-                "type": "button",
-                "text": {"type": "plain_text", "text": "🚨 Escalate"},
-                "style": "danger",
-                "value": f"escalate_{ticket_id}",
-                "action_id": "escalate_ticket"
-            },
-            {
-                "type": "button",
-                "text": {"type": "plain_text", "text": "💬 Feedback"},
-                "value": f"feedback_{ticket_id}",
-                "action_id": "feedback_text"
-            }
-        ]
-    })
+    blocks.append(_agent_response_actions_fragment(ticket_id))
     # If user_id looks like a Slack email (Uxxxx@slack.local), extract the Slack ID
     slack_channel = user_id
     if isinstance(user_id, str) and user_id.endswith("@slack.local"):
@@ -912,25 +967,19 @@ def notify_user_agent_response(user_id, ticket_id, agent_response, thread_ts=Non
     }
     if thread_ts:
         payload["thread_ts"] = thread_ts
-    resp = requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=payload)
-    import logging
-    logging.getLogger(__name__).info(f"Sent agent response to Slack: {resp.text}")
+    resp = _slack_session.post("https://slack.com/api/chat.postMessage", headers=headers, data=orjson.dumps(payload))
+    _log_slack_post(resp, "agent response")
 
 def notify_user_auto_resolution(user_id, ticket_id, params):
     """
     Notify user that their ticket was automatically resolved.
     """
-    from .models import SlackToken
-    import requests
     
-    token_obj = SlackToken.objects.order_by("-created_at").first()
+    token_obj = SlackToken.current()
     if not token_obj:
         return
         
-    headers = {
-        "Authorization": f"Bearer {token_obj.access_token}",
-        "Content-Type": "application/json",
-    }
+    headers = _slack_headers(token_obj)
     
     # Extract Slack user ID if needed
     slack_channel = user_id
@@ -997,24 +1046,19 @@ def notify_user_auto_resolution(user_id, ticket_id, params):
         "text": f"Ticket #{ticket_id} has been auto-resolved",
     }
     
-    resp = requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=payload)
-    logging.getLogger(__name__).info(f"Sent auto-resolution notification: {resp.text}")
+    resp = _slack_session.post("https://slack.com/api/chat.postMessage", headers=headers, data=orjson.dumps(payload))
+    _log_slack_post(resp, "auto-resolution notification")
 
 def notify_escalation(user_id, ticket_id, params):
     """
     Notify user that their ticket has been escalated.
     """
-    from .models import SlackToken
-    import requests
     
-    token_obj = SlackToken.objects.order_by("-created_at").first()
+    token_obj = SlackToken.current()
     if not token_obj:
         return
         
-    headers = {
-        "Authorization": f"Bearer {token_obj.access_token}",
-        "Content-Type": "application/json",
-    }
+    headers = _slack_headers(token_obj)
     
     # Extract Slack user ID if needed
     slack_channel = user_id
@@ -1051,24 +1095,19 @@ def notify_escalation(user_id, ticket_id, params):
         "text": f"Ticket #{ticket_id} has been escalated",
     }
     
-    resp = requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=payload)
-    logging.getLogger(__name__).info(f"Sent escalation notification: {resp.text}")
+    resp = _slack_session.post("https://slack.com/api/chat.postMessage", headers=headers, data=orjson.dumps(payload))
+    _log_slack_post(resp, "escalation notification")
 
 def request_clarification_from_user(user_id, ticket_id, params):
     """
     Request clarification from user via Slack.
     """
-    from .models import SlackToken
-    import requests
     
-    token_obj = SlackToken.objects.order_by("-created_at").first()
+    token_obj = SlackToken.current()
     if not token_obj:
         return
         
-    headers = {
-        "Authorization": f"Bearer {token_obj.access_token}",
-        "Content-Type": "application/json",
-    }
+    headers = _slack_headers(token_obj)
     
     # Extract Slack user ID if needed
     slack_channel = user_id
@@ -1113,24 +1152,19 @@ def request_clarification_from_user(user_id, ticket_id, params):
         "text": f"Need clarification for Ticket #{ticket_id}",
     }
     
-    resp = requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=payload)
-    logging.getLogger(__name__).info(f"Sent clarification request: {resp.text}")
+    resp = _slack_session.post("https://slack.com/api/chat.postMessage", headers=headers, data=orjson.dumps(payload))
+    _log_slack_post(resp, "clarification request")
 
 def send_solution_with_followup(user_id, ticket_id, params):
     """
     Send solution to user with automatic follow-up scheduled.
     """
-    from .models import SlackToken
-    import requests
     
-    token_obj = SlackToken.objects.order_by("-created_at").first()
+    token_obj = SlackToken.current()
     if not token_obj:
         return
         
-    headers = {
-        "Authorization": f"Bearer {token_obj.access_token}",
-        "Content-Type": "application/json",
-    }
+    headers = _slack_headers(token_obj)
     
     # Extract Slack user ID if needed
     slack_channel = user_id
@@ -1192,5 +1226,5 @@ def send_solution_with_followup(user_id, ticket_id, params):
         "text": f"Solution for Ticket #{ticket_id}",
     }
     
-    resp = requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=payload)
-    logging.getLogger(__name__).info(f"Sent solution with follow-up: {resp.text}")
+    resp = _slack_session.post("https://slack.com/api/chat.postMessage", headers=headers, data=orjson.dumps(payload))
+    _log_slack_post(resp, "solution with follow-up")
@@ -0,0 +1,35 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+# Full-text indexes over the same expressions KnowledgeBaseService searches with.
+# Postgres only: SQLite has no tsvector, and search falls back to icontains there.
+SEARCH_INDEXES = [
+    ('knowledgebasearticle', GinIndex(SearchVector('title', 'content', config='english'), name='kb_article_search_idx')),
+    ('llmresponse', GinIndex(SearchVector('query', config='english'), name='llm_response_search_idx')),
+]
+
+
+def add_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, index in SEARCH_INDEXES:
+        schema_editor.add_index(apps.get_model('knowledge_base', model_name), index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, index in SEARCH_INDEXES:
+        schema_editor.remove_index(apps.get_model('knowledge_base', model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge_base', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
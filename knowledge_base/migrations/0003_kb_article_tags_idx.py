@@ -0,0 +1,29 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.db import migrations
+
+# jsonb_path_ops only supports @>, which is all tag lookups use, and is smaller than the default opclass.
+# Postgres only: SQLite has no JSON containment, and tag filtering happens in Python there.
+TAGS_INDEX = GinIndex(fields=['tags'], opclasses=['jsonb_path_ops'], name='kb_article_tags_idx')
+
+
+def add_tags_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.add_index(apps.get_model('knowledge_base', 'knowledgebasearticle'), TAGS_INDEX)
+
+
+def remove_tags_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.remove_index(apps.get_model('knowledge_base', 'knowledgebasearticle'), TAGS_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge_base', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_tags_index, remove_tags_index),
+    ]
@@ -1,5 +1,8 @@
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
 from django.utils import timezone
+import hashlib
+import time
 import uuid
 
 # Create your models here.
@@ -15,12 +18,58 @@ class KnowledgeBaseArticle(models.Model):
     helpful_votes = models.IntegerField(default=0)
     total_votes = models.IntegerField(default=0)
 
+    # Bumped after every committed save/delete, so cached search results from older
+    # generations are never read again. Lives in the shared Redis cache, so a save in
+    # the admin or a worker invalidates every API process.
+    SEARCH_GENERATION_KEY = 'kb_search:generation'
+    SEARCH_CACHE_TIMEOUT = 60
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def search_cache_key(cls, query, limit=None):
+        """Key under which the search endpoints cache serialized results for query."""
+        # add() is atomic, so concurrent first readers agree on the starting generation.
+        # Seeded from the clock, not 0, so an evicted counter can't come back to a value
+        # that still has cached results.
+        cache.add(cls.SEARCH_GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(cls.SEARCH_GENERATION_KEY, 0)
+        digest = hashlib.sha1(f'{query}\0{limit}'.encode()).hexdigest()
+        return f'kb_search:{generation}:{digest}'
+
+    @classmethod
+    def invalidate_search_cache(cls):
+        # Missing (evicted or never read): any fresh value invalidates, so seed one no
+        # cached key can carry. Otherwise INCR, which is atomic across processes.
+        if cache.add(cls.SEARCH_GENERATION_KEY, time.time_ns(), timeout=None):
+            return
+        try:
+            cache.incr(cls.SEARCH_GENERATION_KEY)
+        except ValueError:
+            # Evicted between the add() and the incr()
+            cache.set(cls.SEARCH_GENERATION_KEY, time.time_ns(), timeout=None)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # After commit, or a search running meanwhile could cache pre-save rows under the new generation
+        transaction.on_commit(self.invalidate_search_cache)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(self.invalidate_search_cache)
+        return result
+
     class Meta:
         ordering = ['-created_at']
 
+# LLMResponse.helpfulness_score in SQL, so responses can be ordered by it
+HELPFULNESS_SCORE = models.Case(
+    models.When(total_votes=0, then=models.Value(0.0)),
+    default=100.0 * models.F('helpful_votes') / models.F('total_votes'),
+    output_field=models.FloatField(),
+)
+
 class LLMResponse(models.Model):
     RESPONSE_TYPES = [
         ('TICKET', 'Ticket Resolution'),
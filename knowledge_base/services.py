@@ -1,10 +1,31 @@
-from .models import KnowledgeBaseArticle, LLMResponse
+from .models import HELPFULNESS_SCORE, KnowledgeBaseArticle, LLMResponse
 from tickets.models import Ticket
-from django.db import transaction
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef, Q
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Must match the GIN expression indexes in migration 0002 for Postgres to use them
+ARTICLE_SEARCH_VECTOR = SearchVector('title', 'content', config='english')
+LLM_QUERY_SEARCH_VECTOR = SearchVector('query', config='english')
+
+
+def _uses_postgres():
+    # Tests and local setups run on SQLite, which has no tsvector or JSON containment;
+    # they fall back to icontains and Python-side tag matching
+    return connection.vendor == 'postgresql'
+
+
+def _tag_filter(tag):
+    # Exact tag match via JSON containment, served by the tags GIN index in migration 0003
+    condition = Q(tags__contains=[tag])
+    if tag.lower() != tag:
+        condition |= Q(tags__contains=[tag.lower()])
+    return condition
+
+
 class KnowledgeBaseService:
     @staticmethod
     def store_llm_response(query, response, response_type, ticket=None, related_kb_articles=None):
@@ -28,7 +49,8 @@ class KnowledgeBaseService:
                 )
                 
                 if related_kb_articles:
-                    llm_response.related_kb_articles.set(related_kb_articles)
+                    # New row, so nothing to diff against: add() is a single bulk INSERT, set() adds a SELECT first
+                    llm_response.related_kb_articles.add(*related_kb_articles)
                 
                 return llm_response
         except Exception as e:
@@ -72,15 +94,23 @@ class KnowledgeBaseService:
             is_helpful (bool): Whether the response was helpful
         """
         try:
-            response = LLMResponse.objects.get(response_id=response_id)
-            response.total_votes += 1
+            # Increment in the database so concurrent votes can't overwrite each other
+            votes = {'total_votes': F('total_votes') + 1}
             if is_helpful:
-                response.helpful_votes += 1
-            response.save()
+                votes['helpful_votes'] = F('helpful_votes') + 1
+            if not LLMResponse.objects.filter(response_id=response_id).update(**votes):
+                raise LLMResponse.DoesNotExist
+            # Re-read the new counts, and whether an article is linked, in one query
+            response = LLMResponse.objects.annotate(
+                has_kb_article=Exists(
+                    LLMResponse.related_kb_articles.through.objects.filter(llmresponse_id=OuterRef('pk'))
+                )
+            ).get(response_id=response_id)
             
-            # If response becomes highly rated, consider creating a KB article
-            if response.helpfulness_score >= 80 and not response.related_kb_articles.exists():
-                KnowledgeBaseService.create_kb_article_from_response(response)
+            # If response becomes highly rated, create a KB article from it off the request path
+            if response.helpfulness_score >= 80 and not response.has_kb_article:
+                from .tasks import create_kb_article_for_response
+                transaction.on_commit(lambda: create_kb_article_for_response.delay(response_id))
                 
             return response
         except LLMResponse.DoesNotExist:
@@ -99,8 +129,54 @@ class KnowledgeBaseService:
             query (str): The search query
             limit (int): Maximum number of responses to return
         """
-        # This is a simple implementation. In production, you might want to use
-        # more sophisticated search algorithms or vector similarity search
-        return LLMResponse.objects.filter(
+        if _uses_postgres():
+            search_query = SearchQuery(query, config='english', search_type='websearch')
+            return LLMResponse.objects.prefetch_related('related_kb_articles').annotate(
+                search=LLM_QUERY_SEARCH_VECTOR,
+                rank=SearchRank(LLM_QUERY_SEARCH_VECTOR, search_query),
+                score=HELPFULNESS_SCORE,
+            ).filter(search=search_query).order_by('-rank', '-score', '-created_at')[:limit]
+        return LLMResponse.objects.prefetch_related('related_kb_articles').filter(
             query__icontains=query
-        ).order_by('-helpfulness_score', '-created_at')[:limit] 
\ No newline at end of file
+        ).annotate(score=HELPFULNESS_SCORE).order_by('-score', '-created_at')[:limit]
+
+    @staticmethod
+    def search_articles(query, limit=None):
+        """
+        Search KB articles by title, content and tags, best matches first.
+
+        Args:
+            query (str): The search query
+            limit (int, optional): Maximum number of articles to return
+        """
+        articles = KnowledgeBaseArticle.objects.all()
+        if _uses_postgres():
+            search_query = SearchQuery(query, config='english', search_type='websearch')
+            articles = articles.annotate(
+                search=ARTICLE_SEARCH_VECTOR,
+                rank=SearchRank(ARTICLE_SEARCH_VECTOR, search_query),
+            ).filter(
+                # Both sides are GIN-indexed, so Postgres can OR two index scans instead of scanning the table
+                Q(search=search_query) | _tag_filter(query)
+            ).order_by('-rank', '-views', '-helpful_votes')
+        else:
+            articles = articles.filter(
+                Q(title__icontains=query) |
+                Q(content__icontains=query) |
+                Q(tags__icontains=query)
+            ).order_by('-views', '-helpful_votes')
+        if limit is not None:
+            articles = articles[:limit]
+        return articles 
+
+    @staticmethod
+    def filter_articles_by_tag(articles, tag):
+        """
+        Narrow an article queryset to those tagged with tag.
+
+        Returns a list on SQLite, which can't match inside JSON arrays.
+        """
+        if _uses_postgres():
+            return articles.filter(_tag_filter(tag))
+        tag = tag.lower()
+        return [a for a in articles if tag in [str(t).lower() for t in a.tags]]
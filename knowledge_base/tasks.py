@@ -0,0 +1,31 @@
+"""
+Celery tasks for knowledge base upkeep that shouldn't hold up API requests.
+"""
+
+import logging
+
+from celery import shared_task
+from django.db import transaction
+
+from .models import LLMResponse
+from .services import KnowledgeBaseService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def create_kb_article_for_response(response_id):
+    """
+    Promote a highly rated LLM response to a KB article, unless it already links one.
+    Re-reads the vote counts, so a rating that has since dropped below the threshold is skipped.
+    """
+    with transaction.atomic():
+        # Lock the row so two ratings crossing the threshold together create one article
+        response = LLMResponse.objects.select_for_update().filter(response_id=response_id).first()
+        if response is None or response.related_kb_articles.exists():
+            return None
+        article = KnowledgeBaseService.create_kb_article_from_response(response)
+    if article is not None:
+        logger.info("Created KB article %s from LLM response %s", article.kb_id, response_id)
+        return str(article.kb_id)
+    return None
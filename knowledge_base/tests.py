@@ -37,6 +37,8 @@ class KnowledgeBaseTests(TestCase):
             content="Common printer troubleshooting steps:\n1. Check if printer is powered on\n2. Verify network connection\n3. Clear print queue",
             tags=["printer", "hardware"]
         )
+        # TestCase never runs the on-commit bump, so drop search results cached by earlier tests
+        KnowledgeBaseArticle.invalidate_search_cache()
 
     def test_kb_article_creation(self):
         """Test creating a new KB article"""
@@ -59,6 +61,43 @@ class KnowledgeBaseTests(TestCase):
         self.assertTrue(len(response.data['results']) > 0)
         self.assertTrue('VPN Connection Issue' in [r['title'] for r in response.data['results']])
 
+    def test_kb_article_tag_search(self):
+        """Test that search also matches article tags"""
+        url = reverse('knowledgebasearticle-search')
+        response = self.client.post(url, {'query': 'hardware'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['title'] for r in response.data['results']], ['Printer Not Working'])
+
+    def test_kb_article_rate(self):
+        """Test that ratings increment the stored vote counts"""
+        url = reverse('knowledgebasearticle-rate', args=[self.kb_article1.kb_id])
+        self.client.post(url, {'is_helpful': True}, format='json')
+        response = self.client.post(url, {'is_helpful': False}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.kb_article1.refresh_from_db()
+        self.assertEqual((self.kb_article1.helpful_votes, self.kb_article1.total_votes), (1, 2))
+
+    def test_kb_article_search_sees_new_votes(self):
+        """Test that cached search results are dropped when an article is rated"""
+        url = reverse('knowledgebasearticle-search')
+        self.client.post(url, {'query': 'VPN'}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('knowledgebasearticle-rate', args=[self.kb_article1.kb_id]), {'is_helpful': True}, format='json'
+            )
+        response = self.client.post(url, {'query': 'VPN'}, format='json')
+        result = next(r for r in response.data['results'] if r['kb_id'] == str(self.kb_article1.kb_id))
+        self.assertEqual((result['helpful_votes'], result['total_votes']), (1, 1))
+
+    def test_kb_article_search_sees_new_articles(self):
+        """Test that cached search results are dropped when an article is saved"""
+        url = reverse('knowledgebasearticle-search')
+        self.client.post(url, {'query': 'VPN'}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            KnowledgeBaseArticle.objects.create(title="VPN Split Tunnel", content="Configure split tunnelling", tags=[])
+        response = self.client.post(url, {'query': 'VPN'}, format='json')
+        self.assertIn('VPN Split Tunnel', [r['title'] for r in response.data['results']])
+
     def test_kb_article_update(self):
         """Test updating a KB article"""
         url = reverse('knowledgebasearticle-detail', args=[self.kb_article1.kb_id])
@@ -109,3 +148,17 @@ class KnowledgeBaseTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(len(response.data['results']) > 0)
         self.assertTrue('Printer Not Working' in [r['title'] for r in response.data['results']])
+
+
+class RelatedResponsesTests(TestCase):
+    def test_related_responses_ordered_by_helpfulness(self):
+        from .models import LLMResponse
+        from .services import KnowledgeBaseService
+
+        unrated = LLMResponse.objects.create(query="vpn drops", response="a", response_type="KB")
+        mixed = LLMResponse.objects.create(query="vpn drops", response="b", response_type="KB", helpful_votes=1, total_votes=2)
+        helpful = LLMResponse.objects.create(query="vpn drops", response="c", response_type="KB", helpful_votes=3, total_votes=3)
+
+        related = list(KnowledgeBaseService.get_related_responses("vpn"))
+        self.assertEqual(related, [helpful, mixed, unrated])
+        self.assertEqual(related[1].score, mixed.helpfulness_score)
@@ -6,11 +6,27 @@ from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from .models import KnowledgeBaseArticle, LLMResponse
 from .serializers import KnowledgeBaseArticleSerializer, LLMResponseSerializer
 from .services import KnowledgeBaseService
-from django.db.models import Q
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _cached_article_search(query, limit=None):
+    """
+    Serialized KnowledgeBaseService.search_articles results, cached briefly.
+    The FastAPI agent searches on every user turn, while articles rarely change.
+    """
+    key = KnowledgeBaseArticle.search_cache_key(query, limit)
+    results = cache.get(key)
+    if results is None:
+        articles = KnowledgeBaseService.search_articles(query, limit=limit)
+        results = list(KnowledgeBaseArticleSerializer(articles, many=True).data)
+        cache.set(key, results, KnowledgeBaseArticle.SEARCH_CACHE_TIMEOUT)
+    return results
+
 class KnowledgeBaseArticleViewSet(viewsets.ModelViewSet):
     queryset = KnowledgeBaseArticle.objects.all()
     serializer_class = KnowledgeBaseArticleSerializer
@@ -19,27 +35,17 @@ class KnowledgeBaseArticleViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'])
     def search(self, request):
-        query = request.data.get('query', '').lower()
+        query = request.data.get('query', '')
         if not query:
             return Response({'error': 'Query parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # SQLite-compatible search: filter in Python for tags
-        articles = [a for a in self.queryset if (
-            query in a.title.lower() or
-            query in a.content.lower() or
-            any(query in str(tag).lower() for tag in a.tags)
-        )]
-        articles = sorted(articles, key=lambda a: (-a.views, -a.helpful_votes))
-        serializer = self.get_serializer(articles, many=True)
-        return Response({'results': serializer.data})
+        return Response({'results': _cached_article_search(query)})
 
     def get_queryset(self):
         queryset = super().get_queryset()
         tags = self.request.query_params.get('tags')
         if tags:
-            tag = tags.lower()
-            # SQLite-compatible: filter in Python
-            queryset = [a for a in queryset if tag in [str(t).lower() for t in a.tags]]
+            queryset = KnowledgeBaseService.filter_articles_by_tag(queryset, tags)
         return queryset
 
     @action(detail=True, methods=['post'])
@@ -50,15 +56,19 @@ class KnowledgeBaseArticleViewSet(viewsets.ModelViewSet):
         if is_helpful is None:
             return Response({'error': 'is_helpful parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        article.total_votes += 1
+        # Increment in the database so concurrent votes can't overwrite each other
+        votes = {'total_votes': F('total_votes') + 1}
         if is_helpful:
-            article.helpful_votes += 1
-        article.save()
+            votes['helpful_votes'] = F('helpful_votes') + 1
+        KnowledgeBaseArticle.objects.filter(pk=article.pk).update(**votes)
+        # The queryset update skips save(), but cached search results carry the vote counts
+        transaction.on_commit(KnowledgeBaseArticle.invalidate_search_cache)
 
         return Response({'status': 'success'})
 
 class LLMResponseViewSet(viewsets.ModelViewSet):
-    queryset = LLMResponse.objects.all()
+    # The serializer nests every linked article; load them in one query, not one per response
+    queryset = LLMResponse.objects.prefetch_related('related_kb_articles')
     serializer_class = LLMResponseSerializer
     permission_classes = [AllowAny]  # Allow public access for FastAPI agent
     lookup_field = 'response_id'
@@ -131,16 +141,11 @@ def search_kb_for_agent(request):
     if not query:
         return Response({'error': 'Query parameter is required'}, status=400)
     
-    articles = KnowledgeBaseArticle.objects.filter(
-        Q(title__icontains=query) |
-        Q(content__icontains=query)
-    ).order_by('-helpful_votes', '-views')[:limit]
-    
-    serializer = KnowledgeBaseArticleSerializer(articles, many=True)
+    results = _cached_article_search(query, limit=limit)
     return Response({
         'query': query,
-        'results': serializer.data,
-        'count': len(serializer.data)
+        'results': results,
+        'count': len(results)
     })
 
 @api_view(['GET'])
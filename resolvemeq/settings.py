@@ -19,6 +19,9 @@ SECRET_KEY = "django-insecure-xoeau&915nx&jsisbu$@p4h3^iva-4s4bxov6nj5l@y2l48d%r
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# Key for hashing verification/reset codes at rest
+SECURE_CODE_PEPPER = os.getenv("SECURE_CODE_PEPPER", SECRET_KEY)
+
 ALLOWED_HOSTS = ['*']
 FRONTEND_URL="https://app.resolvemeq.com"
 # Application definition
@@ -124,6 +127,15 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Argon2id first; existing PBKDF2 hashes are upgraded on the next successful login
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -166,10 +178,45 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_BROKER_HEARTBEAT = 60
 CELERY_BROKER_CONNECTION_TIMEOUT = 30
+# Email is I/O-bound; keep it off the prefork queue that handles image/CPU work
+CELERY_TASK_ROUTES = {
+    'base.tasks.send_email_with_template': {'queue': 'emails'},
+    'base.tasks.send_email_batch': {'queue': 'emails'},
+    'base.tasks.send_prebuilt_email': {'queue': 'emails'},
+    # Pillow releases the GIL while resizing/encoding, so image work suits a threads pool
+    'base.tasks.process_profile_image': {'queue': 'images'},
+    'base.tasks.generate_thumbnail': {'queue': 'images'},
+    # Slack calls are short HTTPS round-trips; a gevent pool overlaps many of them on the pooled session
+    'integrations.tasks.*': {'queue': 'slack'},
+}
+CELERY_BEAT_SCHEDULE = {
+    'send-email-batch': {
+        'task': 'base.tasks.send_email_batch',
+        'schedule': timedelta(seconds=1),
+    },
+    'flush-slack-notifications': {
+        'task': 'integrations.tasks.flush_slack_notifications',
+        'schedule': timedelta(seconds=1),
+    },
+    'sweep-expired-secure-codes': {
+        'task': 'base.tasks.sweep_expired_secure_codes',
+        'schedule': timedelta(minutes=5),
+    },
+}
 
 # Redis Settings
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
+# Shared by every gunicorn and Celery worker, so a cache write or delete in one
+# process (e.g. a Slack reinstall) is seen by all of them
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'resolvemeq',
+    }
+}
+
 # Email Settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
@@ -191,6 +238,10 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=75),
+    # Tokens identify users by the UUID public_id, never the sequential bigint pk.
+    # Tokens issued before the bigint migration carry the old UUID pk, which is now public_id.
+    'USER_ID_FIELD': 'public_id',
+    'USER_ID_CLAIM': 'user_id',
 }
 
 AUTH_USER_MODEL = 'base.User'
@@ -1,5 +1,5 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from tickets.models import Ticket
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -36,23 +36,13 @@ class Solution(models.Model):
         return f"Solution for Ticket {self.ticket.ticket_id}"
 
     def save(self, *args, **kwargs):
-        # If solution is marked as worked, create/update KB entry
-        if self.worked and not self._state.adding:
-            KnowledgeBaseEntry.objects.update_or_create(
-                ticket=self.ticket,
-                defaults={
-                    'issue_type': self.ticket.issue_type,
-                    'description': self.ticket.description,
-                    'solution': self.steps,
-                    'category': self.ticket.category,
-                    'tags': self.ticket.tags,
-                    'confidence_score': self.confidence_score,
-                    'verified': bool(self.verified_by),
-                    'verified_by': self.verified_by,
-                    'verification_date': self.verification_date
-                }
-            )
+        # If solution is marked as worked, create/update KB entry once this save commits,
+        # from a worker rather than inside the caller's transaction
+        sync_kb_entry = self.worked and not self._state.adding
         super().save(*args, **kwargs)
+        if sync_kb_entry:
+            from .tasks import sync_kb_entry_for_solution
+            transaction.on_commit(lambda: sync_kb_entry_for_solution.delay(self.pk))
 
 class KnowledgeBaseEntry(models.Model):
     ticket = models.OneToOneField(
@@ -0,0 +1,43 @@
+"""
+Celery tasks that keep knowledge base entries in step with solutions.
+"""
+
+from celery import shared_task
+
+from .models import KnowledgeBaseEntry, Solution
+
+
+@shared_task
+def sync_kb_entry_for_solution(solution_id):
+    """
+    Create or update the KB entry for a solution marked as worked.
+    Reads the solution fresh, so a later un-marking wins over a queued sync.
+    """
+    solution = (
+        Solution.objects.select_related('ticket')
+        # Skip the ticket's agent_response JSON and other columns the entry doesn't copy
+        .only(
+            'ticket_id', 'steps', 'worked', 'confidence_score', 'verified_by_id', 'verification_date',
+            'ticket__issue_type', 'ticket__description', 'ticket__category', 'ticket__tags',
+        )
+        .filter(pk=solution_id)
+        .first()
+    )
+    if solution is None or not solution.worked:
+        return False
+    ticket = solution.ticket
+    KnowledgeBaseEntry.objects.update_or_create(
+        ticket_id=solution.ticket_id,
+        defaults={
+            'issue_type': ticket.issue_type,
+            'description': ticket.description,
+            'solution': solution.steps,
+            'category': ticket.category,
+            'tags': ticket.tags,
+            'confidence_score': solution.confidence_score,
+            'verified': solution.verified_by_id is not None,
+            'verified_by_id': solution.verified_by_id,
+            'verification_date': solution.verification_date,
+        }
+    )
+    return True
@@ -1,8 +1,7 @@
 from django.contrib import admin
 from .models import Ticket
-from integrations.models import SlackToken
+from integrations.tasks import send_slack_message
 from integrations.views import notify_user_ticket_resolved
-import requests
 import csv
 from django.http import HttpResponse
 
@@ -15,20 +14,13 @@ def mark_as_resolved(modeladmin, request, queryset):
 
 @admin.action(description="Respond via Slack bot")
 def respond_via_bot(modeladmin, request, queryset):
-    token_obj = SlackToken.objects.order_by("-created_at").first()
-    if not token_obj:
-        return
-    for ticket in queryset:
+    # Posted from the Slack worker, so a large selection doesn't hold up the admin page
+    for ticket in queryset.select_related("user"):
         if ticket.user and hasattr(ticket.user, "user_id"):
-            headers = {
-                "Authorization": f"Bearer {token_obj.access_token}",
-                "Content-Type": "application/json",
-            }
-            reply_data = {
-                "channel": ticket.user.user_id,  # Slack user_id as channel for DM
-                "text": f"IT has responded to your ticket: {ticket.issue_type}\nStatus: {ticket.status}\nDescription: {ticket.description}",
-            }
-            requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=reply_data)
+            send_slack_message.delay(
+                ticket.user.user_id,  # Slack user_id as channel for DM
+                f"IT has responded to your ticket: {ticket.issue_type}\nStatus: {ticket.status}\nDescription: {ticket.description}",
+            )
 
 @admin.action(description="Export selected tickets as CSV")
 def export_tickets_csv(modeladmin, request, queryset):
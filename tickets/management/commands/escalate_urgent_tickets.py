@@ -2,7 +2,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from tickets.models import Ticket
 from integrations.models import SlackToken
-import requests
+from integrations.views import _slack_headers, _slack_session
 
 class Command(BaseCommand):
     help = "Escalate urgent tickets not updated in 2 hours"
@@ -10,27 +10,27 @@ class Command(BaseCommand):
     def handle(self, *args, **kwargs):
         two_hours_ago = timezone.now() - timezone.timedelta(hours=2)
         # Find urgent tickets not resolved and not updated in 2 hours
-        urgent_tickets = Ticket.objects.filter(
-            status__in=["new", "in-progress"],
-            issue_type__icontains="urgent",
-            updated_at__lt=two_hours_ago
+        urgent_tickets = list(
+            Ticket.objects.filter(
+                status__in=["new", "in-progress"],
+                issue_type__icontains="urgent",
+                updated_at__lt=two_hours_ago
+            ).values_list("ticket_id", "issue_type", "user__username")
         )
-        if not urgent_tickets.exists():
+        if not urgent_tickets:
             return
 
-        message = "*Escalation Alert: Urgent tickets need attention!*\n"
-        for t in urgent_tickets:
-            message += f"- #{t.ticket_id}: {t.issue_type} (by {t.user.name if t.user else t.user_id})\n"
+        message = "*Escalation Alert: Urgent tickets need attention!*\n" + "".join(
+            f"- #{ticket_id}: {issue_type} (by {username})\n"
+            for ticket_id, issue_type, username in urgent_tickets
+        )
 
-        token_obj = SlackToken.objects.order_by("-created_at").first()
+        token_obj = SlackToken.current()
         if token_obj:
-            headers = {
-                "Authorization": f"Bearer {token_obj.access_token}",
-                "Content-Type": "application/json",
-            }
+            headers = _slack_headers(token_obj)
             data = {
                 "channel": "C12345678",  # Replace with your IT team's channel ID
                 "text": message,
             }
-            resp = requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=data)
+            resp = _slack_session.post("https://slack.com/api/chat.postMessage", headers=headers, json=data)
             print("Slack escalation response:", resp.text)
@@ -1,29 +1,32 @@
 from django.core.management.base import BaseCommand
 from tickets.models import Ticket
 from integrations.models import SlackToken
-import requests
+from integrations.views import _slack_headers, _slack_session
 
 class Command(BaseCommand):
     help = "Send daily Slack digest of open tickets"
 
     def handle(self, *args, **kwargs):
-        open_tickets = Ticket.objects.filter(status__in=["new", "in-progress"])
-        if not open_tickets.exists():
+        # One query for exactly the columns the digest prints
+        open_tickets = list(
+            Ticket.objects.filter(status__in=["new", "in-progress"])
+            .order_by("-created_at")
+            .values_list("ticket_id", "issue_type", "user__username")
+        )
+        if not open_tickets:
             return
 
-        digest = "*Daily Open Tickets Digest:*\n"
-        for t in open_tickets:
-            digest += f"- #{t.ticket_id}: {t.issue_type} (by {t.user.name if t.user else t.user_id})\n"
+        digest = "*Daily Open Tickets Digest:*\n" + "".join(
+            f"- #{ticket_id}: {issue_type} (by {username})\n"
+            for ticket_id, issue_type, username in open_tickets
+        )
 
-        token_obj = SlackToken.objects.order_by("-created_at").first()
+        token_obj = SlackToken.current()
         if token_obj:
-            headers = {
-                "Authorization": f"Bearer {token_obj.access_token}",
-                "Content-Type": "application/json",
-            }
+            headers = _slack_headers(token_obj)
             data = {
                 "channel": "D08V7L2L631",  # Replace with your actual channel ID
                 "text": digest,
             }
-            resp = requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=data)
+            resp = _slack_session.post("https://slack.com/api/chat.postMessage", headers=headers, json=data)
             print("Slack digest response:", resp.text)
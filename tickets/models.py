@@ -46,6 +46,12 @@ class Ticket(models.Model):
     agent_response = models.JSONField(null=True, blank=True, help_text="Response from the AI agent analyzing this ticket")
     agent_processed = models.BooleanField(default=False, help_text="Whether the AI agent has processed this ticket")
 
+    class Meta:
+        indexes = [
+            # A user's tickets, newest first (Slack /resolvemeq status)
+            models.Index(fields=['user', '-created_at'], name='ticket_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.issue_type} ({self.status})"
 
@@ -115,8 +121,8 @@ class Ticket(models.Model):
         # If ticket is being marked as resolved and has agent_response, sync to KB and create Solution
         was_resolved = False
         if self.pk:
-            orig = Ticket.objects.get(pk=self.pk)
-            was_resolved = orig.status == "resolved"
+            # Only the old status is needed; skip loading the description and agent_response blobs
+            was_resolved = Ticket.objects.filter(pk=self.pk, status="resolved").exists()
         super().save(*args, **kwargs)
         if self.status == "resolved" and self.agent_response and not was_resolved:
             self.sync_to_knowledge_base()
@@ -1,6 +1,7 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.conf import settings
+from django.db import transaction
 from .models import Ticket
 from .tasks import process_ticket_with_agent
 from celery.exceptions import OperationalError
@@ -17,11 +18,14 @@ def ticket_created(sender, instance, created, **kwargs):
         return
         
     if created and not instance.agent_processed:
-        # Queue the task with Celery
-        try:
-            process_ticket_with_agent.delay(instance.ticket_id)
-        except OperationalError as e:
-            # Log the error or handle it as needed, but do not retry
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Failed to queue Celery task: {e}")
\ No newline at end of file
+        # Queue the task with Celery once the row is committed, so the worker can see it
+        def on_commit():
+            try:
+                process_ticket_with_agent.delay(instance.ticket_id)
+            except OperationalError as e:
+                # Log the error or handle it as needed, but do not retry
+                import logging
+                logger = logging.getLogger(__name__)
+                logger.error(f"Failed to queue Celery task: {e}")
+
+        transaction.on_commit(on_commit)
\ No newline at end of file
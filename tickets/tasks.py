@@ -19,7 +19,7 @@ def process_ticket_with_agent(self, ticket_id, thread_ts=None):
     """
     logger.info(f"Celery task started for ticket_id={ticket_id}")
     try:
-        ticket = Ticket.objects.get(ticket_id=ticket_id)
+        ticket = Ticket.objects.select_related("user").get(ticket_id=ticket_id)
         
         # Skip if already processed
         if ticket.agent_processed:
@@ -34,7 +34,7 @@ def process_ticket_with_agent(self, ticket_id, thread_ts=None):
             "category": ticket.category,
             "tags": ticket.tags,
             "user": {
-                "id": str(ticket.user.id),
+                "id": str(ticket.user.public_id),
                 "name": ticket.user.username,
                 "department": getattr(ticket.user, "department", "")
             }
@@ -127,7 +127,7 @@ def execute_autonomous_action(ticket_id, action, params):
     Execute the autonomous action decided by the agent.
     """
     try:
-        ticket = Ticket.objects.get(ticket_id=ticket_id)
+        ticket = Ticket.objects.select_related("user").get(ticket_id=ticket_id)
         logger.info(f"Executing autonomous action {action} for ticket {ticket_id}")
         
         if action == AgentAction.AUTO_RESOLVE.value:
@@ -168,7 +168,7 @@ def handle_auto_resolve(ticket, params):
     )
     
     # Notify user
-    notify_user_auto_resolution(str(ticket.user.id), ticket.ticket_id, params)
+    notify_user_auto_resolution(str(ticket.user.public_id), ticket.ticket_id, params)
     
     logger.info(f"Auto-resolved ticket {ticket.ticket_id}")
     return True
@@ -191,7 +191,7 @@ def handle_escalate(ticket, params):
     )
     
     # Notify user and support team
-    notify_escalation(str(ticket.user.id), ticket.ticket_id, params)
+    notify_escalation(str(ticket.user.public_id), ticket.ticket_id, params)
     
     logger.info(f"Escalated ticket {ticket.ticket_id}")
     return True
@@ -213,7 +213,7 @@ def handle_request_clarification(ticket, params):
     )
     
     # Send clarification request to user
-    request_clarification_from_user(str(ticket.user.id), ticket.ticket_id, params)
+    request_clarification_from_user(str(ticket.user.public_id), ticket.ticket_id, params)
     
     logger.info(f"Requested clarification for ticket {ticket.ticket_id}")
     return True
@@ -240,7 +240,7 @@ def handle_schedule_followup(ticket, params):
     
     # Send solution to user but don't auto-resolve
     from integrations.views import send_solution_with_followup
-    send_solution_with_followup(str(ticket.user.id), ticket.ticket_id, params)
+    send_solution_with_followup(str(ticket.user.public_id), ticket.ticket_id, params)
     
     logger.info(f"Scheduled follow-up for ticket {ticket.ticket_id}")
     return True
@@ -255,7 +255,7 @@ def handle_create_kb_article(ticket, params):
 def check_ticket_followup(ticket_id, original_params):
     """Follow-up task to check if solution worked."""
     try:
-        ticket = Ticket.objects.get(ticket_id=ticket_id)
+        ticket = Ticket.objects.select_related("user").get(ticket_id=ticket_id)
         
         # If still not resolved, escalate
         if ticket.status not in ["resolved", "closed"]: